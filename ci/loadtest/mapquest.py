@@ -0,0 +1,60 @@
+"""
+A MapQuest stand-in for the load tests, answering the reverse geocoding and the place search requests.
+
+Every location is in MAPQUEST_STATE (NY by default), after MAPQUEST_DELAY_MS (50 by default),
+which is about the latency of the real service.
+"""
+
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+STATE = os.environ.get("MAPQUEST_STATE", "NY")
+DELAY = int(os.environ.get("MAPQUEST_DELAY_MS", "50")) / 1000
+
+REVERSE_GEOCODE = {
+    "info": {"statuscode": 0},
+    "results": [
+        {
+            "locations": [
+                {
+                    "adminArea1": "US",
+                    "adminArea3": STATE,
+                    "adminArea4": "County",
+                    "adminArea5": "City",
+                    "postalCode": "10001",
+                }
+            ]
+        }
+    ],
+}
+SEARCH = {"results": []}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/geocoding/v1/reverse":
+            body = REVERSE_GEOCODE
+        elif path == "/search/v3/prediction":
+            body = SEARCH
+        else:
+            self.send_error(404)
+            return
+
+        time.sleep(DELAY)
+        content = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    ThreadingHTTPServer(("", 8080), Handler).serve_forever()
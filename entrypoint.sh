@@ -15,6 +15,13 @@ runuser -u vlc -- python manage.py migrate --no-input
 mkdir -p compiled/media
 chown $UWSGI_UID:$UWSGI_GID -R compiled/media
 
+# The Prometheus metrics files of the previous workers would be added to the new ones
+if [[ -n "${PROMETHEUS_MULTIPROC_DIR}" ]]; then
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+  mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+  chown $UWSGI_UID:$UWSGI_GID "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
 # Create the superuser
 if [[ -z "${SUPERUSER_EMAIL}" ]]; then
   echo "SUPERUSER_EMAIL env must be set." && exit 127
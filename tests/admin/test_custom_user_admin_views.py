@@ -2,9 +2,12 @@ import csv
 from unittest.mock import MagicMock
 
 from django import forms
-from django.contrib.auth.models import Permission
+from django.contrib.auth.models import Group, Permission
 from django.contrib.messages import get_messages
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from pytest_django.asserts import assertFormError
 
 from tests.base import BaseAdminUnitTest
@@ -327,3 +330,80 @@ class TestCustomUserAdminView(BaseAdminUnitTest):
         request.user = user1
         response = export_users_by_consent(request)
         assert response.status_code == 403
+
+    def test_changelist_query_count(self):
+        group_a = Group.objects.create(name="group a")
+        group_b = Group.objects.create(name="group b")
+
+        def create_users(count):
+            for _ in range(count):
+                user = self.create_user(self.create_library())
+                user.groups.add(group_b, group_a)
+                self.create_library_card(user, user.library)
+                self.create_library_card(user, user.library)
+
+        self.assert_constant_changelist_queries(create_users)
+
+        self.mock_request.user = self.super_user
+        user = CustomUser.objects.exclude(groups=None).first()
+        for url in ("changelist", "change"):
+            # Only the changelist annotates the columns, the other pages compute them
+            self.mock_request.resolver_match = resolve(
+                reverse(
+                    f"admin:virtuallibrarycard_customuser_{url}",
+                    args=[] if url == "changelist" else [user.id],
+                )
+            )
+            queryset = self.admin.get_queryset(self.mock_request)
+            assert ("library_card_count" in queryset.query.annotations) == (
+                url == "changelist"
+            )
+
+            obj = queryset.get(id=user.id)
+            assert self.admin.groups_permission(obj) == "group a,group b"
+            assert self.admin.nb_library_cards(obj) == 2
+
+            obj = queryset.get(id=self.super_user.id)
+            assert self.admin.groups_permission(obj) == ""
+            assert self.admin.nb_library_cards(obj) == 0
+
+    def test_export_users_by_consent_library_scope(self):
+        library = self.create_library()
+        own_users = [self.create_user(library) for _ in range(3)]
+        other_user = self.create_user(self._default_library)
+        for user in own_users + [other_user]:
+            UserConsent.record_consent(
+                user,
+                UserConsent.ConsentType.SURVEY,
+                UserConsent.ConsentMethod.WEB_CARD_REQUEST,
+            )
+        staff = self.create_user(library, is_staff=True)
+
+        request = RequestFactory().get("/", data=dict(type="SURVEY"))
+        request.user = staff
+        response = export_users_by_consent(request)
+        assert response.status_code == 200
+
+        # Users are joined in the same query
+        with CaptureQueriesContext(connection) as queries:
+            content = [line.decode() for line in response.streaming_content]
+        assert len(queries) == 1
+
+        rows = list(csv.DictReader(content))
+        assert {r["email"] for r in rows} == {u.email for u in own_users}
+        assert {r["name"] for r in rows} == {u.get_full_name() for u in own_users}
+        assert {r["type"] for r in rows} == {"SURVEY"}
+
+    def test_export_users_by_consent_no_library(self):
+        UserConsent.record_consent(
+            self.create_user(self._default_library),
+            UserConsent.ConsentType.SURVEY,
+            UserConsent.ConsentMethod.WEB_CARD_REQUEST,
+        )
+        # Staff without a library do not see any library's users
+        request = RequestFactory().get("/", data=dict(type="SURVEY"))
+        request.user = CustomUser(
+            email="staff@example.com", is_staff=True, library_id=None
+        )
+        response = export_users_by_consent(request)
+        assert response.status_code == 403
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock
 
+from django.urls import resolve, reverse
 from pytest_django.asserts import assertFormError
 
 from tests.base import BaseAdminUnitTest
@@ -233,3 +234,20 @@ class TestLibraryAdminViews(BaseAdminUnitTest):
         changes["allow_bulk_card_uploads"] = True
         response = self.test_client.post(self.get_change_url(library), changes)
         assert response.status_code == 302
+
+    def test_changelist_query_count(self):
+        def create_libraries(count):
+            for _ in range(count):
+                self.create_library(places=["NY", "AL"])
+
+        self.assert_constant_changelist_queries(create_libraries)
+
+        # Only the changelist prefetches the places
+        library = Library.objects.first()
+        self.mock_request.user = self.super_user
+        for url, args in (("changelist", []), ("change", [library.id])):
+            self.mock_request.resolver_match = resolve(
+                reverse(f"admin:virtuallibrarycard_library_{url}", args=args)
+            )
+            queryset = self.admin.get_queryset(self.mock_request)
+            assert bool(queryset._prefetch_related_lookups) == (url == "changelist")
@@ -1,8 +1,13 @@
+import csv
+from datetime import UTC, datetime, timedelta
 from unittest.mock import patch
 
 import pytest
 from django.core.exceptions import PermissionDenied
+from django.db import connection
+from django.http import StreamingHttpResponse
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from pytest_django.asserts import assertFormError
 
 from tests.base import BaseAdminUnitTest, BaseUnitTest
@@ -66,6 +71,32 @@ class TestLibraryCardAdminViews(BaseAdminUnitTest):
         assert cards[0].number.startswith(prefix)
         assert cards[0].number != prefix  # we are not only the prefix, but more
 
+    def test_status_filter(self):
+        user = self.create_user(self._default_library)
+        active = self.create_library_card(user, self._default_library)
+        due = self.create_library_card(user, self._default_library)
+        # Past its expiration date, but not marked by expirelibrarycards yet
+        LibraryCard.objects.filter(id=due.id).update(
+            expiration_date=datetime.now(UTC) - timedelta(days=1)
+        )
+        cancelled = self.create_library_card(
+            user, self._default_library, canceled_date=datetime.now(UTC)
+        )
+        cards = {active.id, due.id, cancelled.id}
+
+        def filtered(status):
+            response = self.test_client.get(
+                self.get_changelist_url(), {"status": status}
+            )
+            assert response.status_code == 200
+            return {
+                card.id for card in response.context["cl"].queryset if card.id in cards
+            }
+
+        assert filtered("active") == {active.id}
+        assert filtered("expired") == {due.id}
+        assert filtered("cancelled") == {cancelled.id}
+
     def test_create_card_with_number_not_unique(self):
         prefix = self._default_library.prefix
         user = self.create_user(self._default_library)
@@ -106,6 +137,38 @@ class TestLibraryCardAdminViews(BaseAdminUnitTest):
         self.admin.change_view(None, str(card.id), "", dict())
         assert mock_super.call_args_list[0][0][3] == dict()
 
+    def test_export_as_csv(self):
+        users = [self.create_user(self._default_library) for _ in range(5)]
+        cards = [self.create_library_card(u, self._default_library) for u in users]
+
+        request = RequestFactory().get("/")
+        request.user = self.super_user
+        queryset = LibraryCard.objects.filter(id__in=[c.id for c in cards])
+        response = self.admin.export_as_csv(request, queryset)
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert response["Content-Disposition"] == (
+            "attachment; filename=virtuallibrarycard.librarycard.csv"
+        )
+
+        # The related user and library are joined, not loaded per row
+        with CaptureQueriesContext(connection) as queries:
+            content = [line.decode() for line in response.streaming_content]
+        assert len(queries) == 1
+
+        rows = list(csv.DictReader(content))
+        assert {r["number"] for r in rows} == {c.number for c in cards}
+        assert {r["user"] for r in rows} == {str(u) for u in users}
+        assert {r["library"] for r in rows} == {self._default_library.name}
+
+    def test_changelist_query_count(self):
+        def create_cards(count):
+            for _ in range(count):
+                library = self.create_library()
+                self.create_library_card(self.create_user(library), library)
+
+        self.assert_constant_changelist_queries(create_cards)
+
 
 class TestLibraryCardUploadsCSV(BaseUnitTest):
     def test_permissions(self):
@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tests.base import BaseAdminUnitTest
+from virtuallibrarycard.admin import CustomUserAdmin, LibraryCardAdmin
+from virtuallibrarycard.models import CustomUser, LibraryCard
+from virtuallibrarycard.pagination import (
+    AFTER_VAR,
+    BEFORE_VAR,
+    EstimatedCountPaginator,
+    KeysetChangeList,
+    estimated_count,
+)
+
+
+class TestEstimatedCountPaginator(BaseAdminUnitTest):
+    MODEL = LibraryCard
+    MODEL_ADMIN = LibraryCardAdmin
+
+    def test_count(self):
+        user = self.create_user(self._default_library)
+        for _ in range(5):
+            self.create_library_card(user, self._default_library)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE virtuallibrarycard_librarycard")
+
+        queryset = LibraryCard.objects.order_by("id")
+        total = queryset.count()
+        assert estimated_count(queryset) == total
+
+        # Small tables are counted exactly
+        with CaptureQueriesContext(connection) as queries:
+            assert EstimatedCountPaginator(queryset, 2).count == total
+        assert "COUNT" in queries[-1]["sql"]
+
+        with mock.patch("virtuallibrarycard.pagination.ESTIMATE_THRESHOLD", 1):
+            with CaptureQueriesContext(connection) as queries:
+                assert EstimatedCountPaginator(queryset, 2).count == total
+            assert "COUNT" not in queries[-1]["sql"]
+
+            # Filtered querysets are always counted
+            filtered = queryset.filter(number__isnull=True)
+            assert estimated_count(filtered) is None
+            assert EstimatedCountPaginator(filtered, 2).count == 0
+
+
+@override_settings(ADMIN_KEYSET_PAGINATION=True)
+class TestKeysetChangeList(BaseAdminUnitTest):
+    MODEL = LibraryCard
+    MODEL_ADMIN = LibraryCardAdmin
+
+    def setup_method(self, request):
+        ret = super().setup_method(request)
+        user = self.create_user(self._default_library)
+        for _ in range(7):
+            self.create_library_card(user, self._default_library)
+        # The default ordering is by descending id
+        self.cards = list(LibraryCard.objects.order_by("-id"))
+        patcher = mock.patch.object(LibraryCardAdmin, "list_per_page", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return ret
+
+    def get_changelist(self, query_string=""):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.test_client.get(self.get_changelist_url() + query_string)
+        assert response.status_code == 200
+        cl = response.context["cl"]
+        assert isinstance(cl, KeysetChangeList)
+        return cl, [q["sql"] for q in queries]
+
+    def test_seek(self):
+        cl, _ = self.get_changelist()
+        assert list(cl.result_list) == self.cards[0:2]
+        assert cl.result_count == len(self.cards) == 8
+
+        next_page = cl.get_query_string({PAGE_VAR: 2})
+        assert AFTER_VAR in next_page
+        # Only the adjacent pages have a cursor
+        assert AFTER_VAR not in cl.get_query_string({PAGE_VAR: 3})
+
+        cl, queries = self.get_changelist(next_page)
+        assert cl.page_num == 2
+        assert list(cl.result_list) == self.cards[2:4]
+        assert not any("OFFSET" in sql for sql in queries)
+
+        cl, _ = self.get_changelist(cl.get_query_string({PAGE_VAR: 3}))
+        assert list(cl.result_list) == self.cards[4:6]
+
+        # Back to the previous page
+        previous_page = cl.get_query_string({PAGE_VAR: 2})
+        assert BEFORE_VAR in previous_page
+        cl, queries = self.get_changelist(previous_page)
+        assert list(cl.result_list) == self.cards[2:4]
+        assert not any("OFFSET" in sql for sql in queries)
+
+        # The cursors do not leak into the other links
+        assert AFTER_VAR not in cl.get_query_string({PAGE_VAR: 1})
+        assert BEFORE_VAR not in cl.get_query_string({PAGE_VAR: 3})
+
+    def test_offset_fallback(self):
+        # Pages without a cursor
+        cl, _ = self.get_changelist(f"?{PAGE_VAR}=4")
+        assert list(cl.result_list) == self.cards[6:8]
+
+        # An invalid cursor
+        cl, _ = self.get_changelist(f"?{PAGE_VAR}=2&{AFTER_VAR}=notacursor")
+        assert list(cl.result_list) == self.cards[2:4]
+
+        # The expiration date can be empty, it cannot be seeked on
+        cl, _ = self.get_changelist("?o=4")
+        assert cl.queryset.query.order_by[0] == "expiration_date"
+        assert cl.keyset_fields() is None
+        assert AFTER_VAR not in cl.get_query_string({PAGE_VAR: 2})
+
+    def test_disabled(self):
+        with override_settings(ADMIN_KEYSET_PAGINATION=False):
+            response = self.test_client.get(self.get_changelist_url())
+        assert not isinstance(response.context["cl"], KeysetChangeList)
+
+
+@override_settings(ADMIN_KEYSET_PAGINATION=True)
+class TestKeysetCustomUserChangeList(BaseAdminUnitTest):
+    MODEL = CustomUser
+    MODEL_ADMIN = CustomUserAdmin
+
+    @mock.patch.object(CustomUserAdmin, "list_per_page", 2)
+    def test_seek(self):
+        for _ in range(5):
+            self.create_user(self._default_library)
+        users = list(CustomUser.objects.order_by("email", "-id"))
+
+        response = self.test_client.get(self.get_changelist_url())
+        cl = response.context["cl"]
+        assert list(cl.result_list) == users[0:2]
+
+        # Seek on the email, then the id
+        next_page = cl.get_query_string({PAGE_VAR: 2})
+        assert AFTER_VAR in next_page
+        response = self.test_client.get(self.get_changelist_url() + next_page)
+        assert list(response.context["cl"].result_list) == users[2:4]
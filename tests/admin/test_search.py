@@ -0,0 +1,99 @@
+from tests.base import BaseAdminUnitTest, explain
+from virtuallibrarycard.admin import CustomUserAdmin, PlaceAdmin
+from virtuallibrarycard.models import CustomUser, Place
+
+
+class TestCustomUserSearch(BaseAdminUnitTest):
+    MODEL = CustomUser
+    MODEL_ADMIN = CustomUserAdmin
+
+    def search(self, term, queryset=None):
+        queryset, _ = self.admin.get_search_results(
+            self.mock_request,
+            CustomUser.objects.all() if queryset is None else queryset,
+            term,
+        )
+        return queryset
+
+    def test_search(self):
+        jane = self.create_user(
+            self._default_library,
+            email="jane.doe@example.org",
+            first_name="Jane",
+            last_name="Doe",
+        )
+        al = self.create_user(
+            self._default_library,
+            email="al@example.org",
+            first_name="Al",
+            last_name="Jandoe",
+        )
+        users = CustomUser.objects.filter(id__in=[jane.id, al.id])
+
+        # Contains
+        assert set(self.search("doe", users)) == {jane, al}
+        assert set(self.search("EXAMPLE", users)) == {jane, al}
+        assert set(self.search("jane doe", users)) == {jane}
+
+        # Email addresses, whole or in part
+        assert set(self.search("jane.doe@", users)) == {jane}
+        assert set(self.search("JANE.DOE@EXAMPLE.ORG", users)) == {jane}
+        assert set(self.search("doe@example.org", users)) == {jane}
+        assert set(self.search("@example.org", users)) == {jane, al}
+
+        # Short terms match anywhere in a field
+        assert set(self.search("al", users)) == {al}
+        assert set(self.search("ja", users)) == {jane, al}
+        assert set(self.search("oe", users)) == {jane, al}
+
+    def test_search_prefix_first(self):
+        joan = self.create_user(
+            self._default_library,
+            email="joan@example.org",
+            first_name="Joan",
+            last_name="Smith",
+        )
+        anna = self.create_user(
+            self._default_library,
+            email="anna@example.org",
+            first_name="Anna",
+            last_name="Lee",
+        )
+        users = CustomUser.objects.filter(id__in=[joan.id, anna.id])
+        # The users whose name starts with the term, then the other ones
+        assert list(self.search("an", users.order_by("-email"))) == [anna, joan]
+        assert list(self.search("oa", users)) == [joan]
+
+    def test_search_indexes(self):
+        plan = explain(self.search("doe"))
+        assert "customuser_email_trgm" in plan
+        assert "customuser_first_name_trgm" in plan
+        assert "customuser_last_name_trgm" in plan
+
+        assert "customuser_email_trgm" in explain(self.search("jane.doe@"))
+
+
+class TestPlaceSearch(BaseAdminUnitTest):
+    MODEL = Place
+    MODEL_ADMIN = PlaceAdmin
+
+    def search(self, term):
+        queryset, _ = self.admin.get_search_results(
+            self.mock_request, Place.objects.all(), term
+        )
+        return queryset
+
+    def test_search(self):
+        new_york = Place.by_abbreviation("NY")
+        assert new_york in self.search("new york")
+        assert new_york in self.search("NY")
+        assert new_york in self.search("ne")
+        assert new_york in self.search("ew")
+        # The places starting with the term come first
+        assert self.search("new york")[0].name.startswith("New York")
+
+    def test_search_indexes(self):
+        # The admin search also joins the parent, which the (small) places table can afford
+        assert "place_name_trgm" in explain(
+            Place.objects.filter(name__icontains="york")
+        )
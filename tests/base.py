@@ -1,4 +1,5 @@
 import sys
+from collections.abc import Callable
 from logging import StreamHandler
 from random import choice
 from unittest import mock
@@ -6,8 +7,9 @@ from unittest import mock
 import pytest
 from django.contrib.admin import ModelAdmin
 from django.contrib.admin.sites import AdminSite
-from django.db import transaction
+from django.db import connection, transaction
 from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from virtual_library_card.logging import log
@@ -22,6 +24,15 @@ log.removeHandler(log.handlers[0])
 log.addHandler(StreamHandler(stream=sys.stdout))
 
 
+def explain(queryset) -> str:
+    """The query plan, with sequential scans discouraged as the test tables are tiny"""
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        cursor.execute("RESET enable_seqscan")
+    return plan
+
+
 class TestData:
     LOWER_ALPH = [chr(i) for i in range(ord("a"), ord("z") + 1)]
     UPPER_ALPH = [chr(i) for i in range(ord("A"), ord("Z") + 1)]
@@ -197,6 +208,26 @@ class BaseAdminUnitTest(BaseUnitTest):
     def get_add_url(self):
         return reverse(f"admin:virtuallibrarycard_{self.MODEL.__name__.lower()}_add")
 
+    def get_changelist_url(self):
+        return reverse(
+            f"admin:virtuallibrarycard_{self.MODEL.__name__.lower()}_changelist"
+        )
+
+    def get_changelist_query_count(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.test_client.get(self.get_changelist_url())
+        assert response.status_code == 200
+        return len(queries)
+
+    def assert_constant_changelist_queries(self, create_objects: Callable[[int], None]):
+        """The changelist page should not run queries per row.
+        Load the page with a few rows, then with more, the number of queries must stay the same.
+        """
+        create_objects(3)
+        queries = self.get_changelist_query_count()
+        create_objects(6)
+        assert self.get_changelist_query_count() == queries
+
     def _response_errors(self, response):
         """Helper function for debuging form submits"""
         return response.context[0]["adminform"].errors
@@ -216,3 +247,6 @@ class MockThread:
         args = self.args or []
         kwargs = self.kwargs or {}
         self.target(*args, **kwargs)
+
+    def join(self):
+        """the target already ran in start"""
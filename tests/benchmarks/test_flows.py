@@ -0,0 +1,154 @@
+"""
+Benchmarks of the API and the signup and sign in flows, through the Django test client.
+
+They run once, as plain tests, with the rest of the suite. To measure them:
+
+    pytest tests/benchmarks --benchmark-enable --benchmark-autosave
+    pytest tests/benchmarks --benchmark-enable --benchmark-compare
+
+The MapQuest calls are answered by a stand-in returning after MAPQUEST_LATENCY, the emails go to the
+test outbox.
+"""
+
+import json
+import time
+from io import BytesIO
+from itertools import count
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.test import Client
+
+from tests.base import BaseUnitTest
+from virtuallibrarycard.business_rules.library_card import LibraryCardBulkUpload
+
+MAPQUEST_LATENCY = 0.05
+PASSWORD = "benchmark-password"
+
+
+class MapQuestResponse:
+    """A stand-in for the reverse geocoding response"""
+
+    status = 200
+
+    def __init__(self, state: str):
+        self.state = state
+
+    def read(self) -> bytes:
+        time.sleep(MAPQUEST_LATENCY)
+        location = dict(
+            adminArea1="US",
+            adminArea3=self.state,
+            adminArea4="County",
+            adminArea5="City",
+        )
+        return json.dumps({"results": [{"locations": [location]}]}).encode()
+
+
+class TestBenchmarks(BaseUnitTest):
+    @pytest.fixture(autouse=True)
+    def _benchmark(self, benchmark):
+        # The fixtures are not passed to the methods of unittest test cases
+        self.benchmark = benchmark
+
+    def setup_method(self, request):
+        super().setup_method(request)
+        self._default_user.set_password(PASSWORD)
+        self._default_user.save()
+        self.unique = count()
+        mapquest = mock.patch(
+            "urllib.request.urlopen",
+            return_value=MapQuestResponse(self._default_library.get_first_place()),
+        )
+        mapquest.start()
+        self.addCleanup(mapquest.stop)
+
+    def test_pintest(self):
+        client = Client()
+        path = f"/PATRONAPI/{self._default_card.number}/{PASSWORD}/pintest"
+        response = self.benchmark(client.get, path)
+        assert b"RETCOD=0" in response.content
+
+    def test_dump(self):
+        client = Client()
+        path = f"/PATRONAPI/{self._default_card.number}/dump"
+        response = self.benchmark(client.get, path)
+        assert b"P BARCODE" in response.content
+
+    def _signup(self, client: Client):
+        identifier = self._default_library.identifier
+        return client.post(
+            f"/account/library_card_signup/{identifier}/",
+            dict(lat=10, long=10, identifier=identifier),
+        )
+
+    def test_signup_geolocation(self):
+        response = self.benchmark(self._signup, Client())
+        assert response.status_code == 302
+        assert "/account/library_card_request/" in response.url
+
+    def test_card_request(self):
+        def card_request():
+            client = Client()
+            self._signup(client)
+            library = self._default_library
+            return client.post(
+                f"/account/library_card_request/?identifier={library.identifier}",
+                dict(
+                    library=library.id,
+                    country_code="US",
+                    first_name="New",
+                    last_name="User",
+                    email=f"signup{next(self.unique)}@example.com",
+                    place=library.places[0].id,
+                    over13="on",
+                    password1=PASSWORD,
+                    password2=PASSWORD,
+                    consent="on",
+                    **{"g-recaptcha-response": "xxxcaptcha"},
+                ),
+            )
+
+        response = self.benchmark(card_request)
+        assert response.status_code == 302
+        assert "/account/library_card_request_success/" in response.url
+        assert mail.outbox
+
+    def test_login(self):
+        def login():
+            return Client().post(
+                f"/accounts/login/{self._default_library.identifier}/",
+                {"username": self._default_user.email, "password": PASSWORD},
+            )
+
+        response = self.benchmark(login)
+        assert response.status_code == 302
+        assert response.url == "/accounts/profile/"
+
+    def test_profile(self):
+        for _ in range(3):
+            self.create_library_card(self._default_user, self.create_library())
+        client = Client()
+        client.force_login(self._default_user)
+
+        response = self.benchmark(client.get, "/accounts/profile/")
+        assert response.status_code == 200
+        assert response.context["nb_library_cards"] == 4
+
+    def test_bulk_upload(self):
+        library = self.create_library(allow_bulk_card_uploads=True)
+
+        def bulk_upload():
+            batch = next(self.unique)
+            rows = "".join(
+                f"{batch}-{i},Name{i},bulk{batch}-{i}@example.com\n" for i in range(50)
+            )
+            LibraryCardBulkUpload.bulk_upload_csv(
+                library,
+                BytesIO(f"id,first_name,email\n{rows}".encode()),
+                admin_user=self._default_user,
+            )
+
+        self.benchmark(bulk_upload)
+        assert library.librarycard_set.count() >= 50
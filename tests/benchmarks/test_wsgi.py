@@ -0,0 +1,18 @@
+import pytest
+
+from virtual_library_card.wsgi import censor_password_from_pintest_uri
+
+
+@pytest.mark.parametrize(
+    "uri",
+    [
+        "/accounts/profile/",
+        "/PATRONAPI/00df2mBTRJX4eh7c/secret/pintest",
+        "/PATRONAPI/00df2mBTRJX4eh7c/secret/pintest?pin=secret&format=xml",
+        "/PATRONAPI/pintest",
+    ],
+    ids=["other", "pintest", "query", "post"],
+)
+def test_censor_pintest_uri(benchmark, uri):
+    censored = benchmark(censor_password_from_pintest_uri, uri)
+    assert "secret" not in censored
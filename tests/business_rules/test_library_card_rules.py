@@ -0,0 +1,51 @@
+from datetime import UTC, datetime
+from io import StringIO
+
+from datedelta import datedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.base import BaseUnitTest
+from virtuallibrarycard.business_rules.library_card import LibraryCardRules
+from virtuallibrarycard.models import LibraryCard
+
+
+class TestLibraryCardRules(BaseUnitTest):
+    def _create_card(self, **fields) -> LibraryCard:
+        card = self.create_library_card(self._default_user, self._default_library)
+        # Bypass save, as if the date passed since the card was last saved
+        LibraryCard.objects.filter(id=card.id).update(**fields)
+        return card
+
+    def test_expire_cards(self):
+        past = datetime.now(UTC) - datedelta(days=1)
+        due = [self._create_card(expiration_date=past) for _ in range(5)]
+        cancelled = self._create_card(
+            expiration_date=past,
+            canceled_date=past,
+            status=LibraryCard.Status.CANCELLED,
+        )
+        future = self._create_card(
+            expiration_date=datetime.now(UTC) + datedelta(days=1)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            assert LibraryCardRules.expire_cards(batch_size=2) == 5
+        # Batches of 2, 2 and 1
+        assert len(queries) == 3
+
+        statuses = dict(LibraryCard.objects.values_list("id", "status"))
+        assert {statuses[c.id] for c in due} == {LibraryCard.Status.EXPIRED}
+        assert statuses[cancelled.id] == LibraryCard.Status.CANCELLED
+        assert statuses[future.id] == LibraryCard.Status.ACTIVE
+        assert statuses[self._default_card.id] == LibraryCard.Status.ACTIVE
+
+        # Nothing left to expire
+        assert LibraryCardRules.expire_cards() == 0
+
+    def test_expirelibrarycards_command(self):
+        self._create_card(expiration_date=datetime.now(UTC) - datedelta(days=1))
+        out = StringIO()
+        call_command("expirelibrarycards", "--batch-size", "10", stdout=out)
+        assert out.getvalue() == "Expired 1 library cards\n"
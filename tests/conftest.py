@@ -0,0 +1,73 @@
+"""
+Query budgets and N+1 reports, see virtual_library_card.query_inspector.
+
+    @pytest.mark.query_budget(4)
+    def test_view(self):
+        ...
+
+fails the test if it runs more than 4 queries. The setup (eg. seed_data) and the savepoints are not counted.
+The tests of the INSPECTED_PATHS whose requests run a query at least QUERY_INSPECTOR_REPEATS times are listed
+at the end of the run, with the code running the query.
+"""
+
+import pytest
+from django.conf import settings
+
+from virtual_library_card.query_inspector import QueryInspector
+
+INSPECTED_PATHS = ("tests/views/", "tests/admin/")
+
+_REPORTS_KEY = pytest.StashKey[dict[str, str]]()
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries): fail the test if it runs more database queries",
+    )
+    config.stash[_REPORTS_KEY] = {}
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    budget = item.get_closest_marker("query_budget")
+    inspected = item.nodeid.startswith(INSPECTED_PATHS)
+    if budget is None and not inspected:
+        return (yield)
+
+    with QueryInspector() as inspector:
+        result = yield
+
+    if inspected:
+        # Each request separately, a test may run the same request several times
+        report = "\n".join(
+            report
+            for request in inspector.by_request()
+            if (
+                report := request.report(
+                    settings.QUERY_INSPECTOR_REPEATS, settings.QUERY_INSPECTOR_SLOW_MS
+                )
+            )
+        )
+        if report:
+            item.config.stash[_REPORTS_KEY][item.nodeid] = report
+
+    if budget is not None and len(inspector.queries) > budget.args[0]:
+        queries = "\n".join(
+            f"{query.origin}: {query.shape}" for query in inspector.queries
+        )
+        pytest.fail(
+            f"{len(inspector.queries)} queries, over the budget of {budget.args[0]}:\n{queries}"
+        )
+    return result
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    reports = config.stash[_REPORTS_KEY]
+    if not reports:
+        return
+    terminalreporter.section("repeated (N+1) and slow queries")
+    for nodeid, report in reports.items():
+        terminalreporter.write_line(nodeid)
+        for line in report.splitlines():
+            terminalreporter.write_line(f"    {line}")
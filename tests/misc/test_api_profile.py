@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+from virtual_library_card.settings.api import api_profile
+
+# Runs in a fresh interpreter, the test process has loaded the website
+SCRIPT = """
+import json, sys
+import django
+django.setup()
+from django.test import Client
+client = Client(HTTP_HOST="localhost")
+version = client.get("/version.json")
+not_found = client.get("/admin/")
+print(json.dumps({
+    "version": version.status_code,
+    "not_found": not_found.status_code,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+def test_api_profile():
+    process = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        env={
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "virtual_library_card.settings.dev_api",
+        },
+        check=True,
+    )
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    assert result["version"] == 200
+    # The website and the admin are not served
+    assert result["not_found"] == 404
+
+    modules = set(result["modules"])
+    assert "virtuallibrarycard.views.views_api" in modules
+    # DRF imports django.contrib.admin itself, but not the admin of the app
+    for module in (
+        "django.contrib.sessions.backends.db",
+        "crispy_forms",
+        "compressor",
+        "dal",
+        "virtuallibrarycard.admin",
+        "virtuallibrarycard.forms",
+        "virtuallibrarycard.views.views_library_card",
+    ):
+        assert module not in modules
+
+
+def test_api_profile_keeps_overrides():
+    jinja = {"BACKEND": "django.template.backends.jinja2.Jinja2", "DIRS": ["custom"]}
+    settings = {
+        "TEMPLATES": [
+            {"BACKEND": "django.template.backends.django.DjangoTemplates"},
+            jinja,
+        ],
+        "REST_FRAMEWORK": {"PAGE_SIZE": 7},
+    }
+    api_profile(settings)
+    assert settings["HAS_WEBSITE"] is False
+    assert settings["TEMPLATES"] == [jinja]
+    assert settings["REST_FRAMEWORK"]["PAGE_SIZE"] == 7
+    assert settings["REST_FRAMEWORK"]["DEFAULT_AUTHENTICATION_CLASSES"] == []
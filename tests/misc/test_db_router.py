@@ -0,0 +1,117 @@
+import time
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.db import router
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.utils import timezone
+
+from tests.base import BaseUnitTest
+from virtual_library_card.db_router import (
+    STICKY_SESSION_KEY,
+    ReplicaRouter,
+    ReplicaRouterMiddleware,
+    replica_reads,
+)
+from virtuallibrarycard.models import LibraryCard
+
+
+@override_settings(DATABASE_REPLICA="replica", DATABASE_REPLICA_STICKY_SECONDS=10)
+class TestReplicaRouter(BaseUnitTest):
+    def request(self, view, session=None):
+        request = RequestFactory().get("/")
+        request.session = {} if session is None else session
+        ReplicaRouterMiddleware(view)(request)
+        return request
+
+    def test_replica_reads(self):
+        reads = []
+
+        def view(request):
+            reads.append(router.db_for_read(LibraryCard))
+            with replica_reads(request):
+                reads.append(router.db_for_read(LibraryCard))
+                # The sessions are always read from the primary
+                reads.append(router.db_for_read(Session))
+            reads.append(router.db_for_read(LibraryCard))
+            return HttpResponse()
+
+        request = self.request(view)
+        assert reads == ["default", "replica", "default", "default"]
+        assert STICKY_SESSION_KEY not in request.session
+
+        # Outside of a request
+        with replica_reads():
+            assert router.db_for_read(LibraryCard) == "default"
+
+    def test_sticky_after_write(self):
+        reads = []
+
+        def view(request):
+            with replica_reads(request):
+                reads.append(router.db_for_read(LibraryCard))
+                self._default_card.save()
+                reads.append(router.db_for_read(LibraryCard))
+            with replica_reads(request):
+                reads.append(router.db_for_read(LibraryCard))
+            return HttpResponse()
+
+        request = self.request(view)
+        assert reads == ["replica", "default", "default"]
+        assert request.session[STICKY_SESSION_KEY] > time.time()
+
+        # The next requests of the session read from the primary
+        reads.clear()
+        self.request(view, session=request.session)
+        assert reads == ["default", "default", "default"]
+
+        # Until the window is over
+        reads.clear()
+        self.request(view, session={STICKY_SESSION_KEY: time.time() - 1})
+        assert reads == ["replica", "default", "default"]
+
+    def test_session_writes(self):
+        def view(request):
+            with replica_reads(request):
+                Session(session_key="key", expire_date=timezone.now()).save()
+                assert router.db_for_read(LibraryCard) == "replica"
+            return HttpResponse()
+
+        request = self.request(view)
+        assert STICKY_SESSION_KEY not in request.session
+
+    def test_disabled(self):
+        def view(request):
+            with replica_reads(request):
+                assert router.db_for_read(LibraryCard) == "default"
+                self._default_card.save()
+            return HttpResponse()
+
+        with override_settings(DATABASE_REPLICA=None):
+            request = self.request(view)
+        assert STICKY_SESSION_KEY not in request.session
+
+    def test_allow_migrate(self):
+        assert ReplicaRouter().allow_migrate("replica", "virtuallibrarycard") is False
+        assert ReplicaRouter().allow_migrate("default", "virtuallibrarycard") is None
+
+    def test_views(self):
+        reads = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(self, model, **hints):
+            db = db_for_read(self, model, **hints)
+            reads.append((model, db))
+            return db
+
+        # The replica is the default database in the tests
+        with (
+            mock.patch.object(ReplicaRouter, "db_for_read", record),
+            override_settings(DATABASE_REPLICA="default"),
+        ):
+            response = Client().get(
+                f"/PATRONAPI/{self._default_card.number}/xxx/pintest"
+            )
+        assert response.status_code == 200
+        assert (LibraryCard, "default") in reads
@@ -0,0 +1,100 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+
+from tests.base import BaseUnitTest
+from virtuallibrarycard.models import (
+    CustomUser,
+    Library,
+    LibraryCard,
+    LibraryPlace,
+    Place,
+    UserConsent,
+)
+
+
+class TestGenerateData(BaseUnitTest):
+    def generate(self, *args) -> str:
+        out = StringIO()
+        call_command(
+            "generatedata",
+            "--libraries",
+            "5",
+            "--places",
+            "8",
+            "--users",
+            "60",
+            "--batch-size",
+            "25",
+            "--seed",
+            "3",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    @staticmethod
+    def synthetic_users():
+        return CustomUser.objects.filter(email__endswith="@synthetic.example.com")
+
+    def test_generatedata(self):
+        out = self.generate("--consent", "1")
+        assert out.startswith("Generated 8 places, 5 libraries, 60 users")
+
+        places = Place.objects.filter(external_id__startswith="synthetic-")
+        assert places.filter(type=Place.Types.COUNTY, parent__type="state").count() == 2
+        assert places.filter(type=Place.Types.CITY, parent__type="county").count() == 6
+        libraries = Library.objects.filter(identifier__startswith="synthetic-")
+        assert libraries.count() == 5
+        assert not libraries.annotate(places=Count("library_places")).filter(places=0)
+
+        users = self.synthetic_users()
+        assert users.count() == 60
+        cards = LibraryCard.objects.filter(user__in=users)
+        assert cards.count() >= 60
+        # Every user has a card for their library, some have more
+        assert cards.filter(library=F("user__library")).count() == 60
+        assert cards.values("user").annotate(n=Count("id")).filter(n__gt=1).exists()
+        assert users.first().check_password("synthetic-password")
+
+        for card in cards.select_related("library"):
+            assert card.status == card.get_status()
+            assert len(card.number) == 14
+            assert card.number.startswith(card.library.prefix)
+        numbers = cards.values_list("library", "number")
+        assert len(set(numbers)) == len(numbers)
+        assert set(cards.values_list("status", flat=True)) == set(LibraryCard.Status)
+
+        consents = UserConsent.objects.filter(user__in=users)
+        assert (
+            consents.count() == users.filter(library__has_survey_consent=True).count()
+        )
+
+    def test_seed(self):
+        def generated():
+            users = self.synthetic_users().order_by("email")
+            return (
+                list(users.values_list("email", "library__identifier")),
+                sorted(
+                    LibraryCard.objects.filter(user__in=users).values_list(
+                        "number", "status"
+                    )
+                ),
+            )
+
+        self.generate()
+        first = generated()
+        with pytest.raises(CommandError):
+            self.generate()
+
+        assert self.generate("--delete").startswith("Deleted the synthetic data")
+        assert not self.synthetic_users().exists()
+        assert not Library.objects.filter(identifier__startswith="synthetic-")
+        assert not Place.objects.filter(external_id__startswith="synthetic-")
+        assert LibraryPlace.objects.filter(library=self._default_library).exists()
+        assert LibraryCard.objects.filter(id=self._default_card.id).exists()
+
+        self.generate()
+        assert generated() == first
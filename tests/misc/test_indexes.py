@@ -0,0 +1,112 @@
+from datetime import UTC, datetime
+
+from django.db import connection
+
+from tests.base import BaseUnitTest, explain
+from virtuallibrarycard.models import CustomUser, LibraryCard, Place, UserConsent
+
+
+class TestIndexes(BaseUnitTest):
+    """The query shapes of the hot paths are served by an index"""
+
+    def setup_method(self, request):
+        ret = super().setup_method(request)
+        # Enough rows and statistics for the planner to pick the most selective index
+        self.libraries = libraries = [self.create_library() for _ in range(5)]
+        self.users = users = CustomUser.objects.bulk_create(
+            CustomUser(
+                email=f"user{i}@example.com",
+                first_name="user",
+                library=libraries[i % 5],
+            )
+            for i in range(500)
+        )
+        statuses = list(LibraryCard.Status)
+        LibraryCard.objects.bulk_create(
+            LibraryCard(
+                number=f"card{i}",
+                user=users[i % 500],
+                library=libraries[i % 5],
+                status=statuses[i % 3],
+            )
+            for i in range(2000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return ret
+
+    def assert_index(self, queryset, index: str):
+        plan = explain(queryset)
+        assert index in plan, plan
+
+    def test_library_card_number(self):
+        card = LibraryCard.objects.get(number="card0")
+        # PinTestViewSet and the PATRONAPI dump
+        self.assert_index(
+            LibraryCard.objects.filter(number=card.number),
+            "librarycard_number_library",
+        )
+        # CardNumber, looking for an available number
+        self.assert_index(
+            LibraryCard.objects.filter(library=card.library, number=card.number),
+            "librarycard_number_library",
+        )
+
+    def test_library_card_user(self):
+        user = self.users[0]
+        # LibraryCardRules.new_card
+        self.assert_index(
+            LibraryCard.objects.filter(user=user, library=self.libraries[0]),
+            "librarycard_user_library",
+        )
+        self.assert_index(
+            LibraryCard.objects.filter(user=user), "librarycard_user_library"
+        )
+        # set_context_library_cards
+        self.assert_index(
+            LibraryCard.objects.filter(user=user, status=LibraryCard.Status.ACTIVE),
+            "librarycard_user_library",
+        )
+
+    def test_library_card_expiry(self):
+        # LibraryCardRules.expire_cards
+        self.assert_index(
+            LibraryCard.objects.filter(
+                status=LibraryCard.Status.ACTIVE,
+                expiration_date__lte=datetime.now(UTC),
+            ),
+            "librarycard_active_expiry",
+        )
+
+    def test_library_card_status(self):
+        # The library card admin, filtered by library and status
+        self.assert_index(
+            LibraryCard.objects.filter(
+                library=self.libraries[0], status=LibraryCard.Status.EXPIRED
+            ),
+            "librarycard_library_status",
+        )
+        self.assert_index(
+            LibraryCard.objects.filter(library=self.libraries[0]),
+            "librarycard_library_status",
+        )
+
+    def test_library_admins(self):
+        self.assert_index(
+            CustomUser.objects.filter(is_staff=True, library=self.libraries[0]),
+            "customuser_staff_library",
+        )
+
+    def test_place_abbreviation(self):
+        self.assert_index(
+            Place.objects.filter(abbreviation="NY"),
+            "place_abbreviation",
+        )
+
+    def test_consent_export(self):
+        self.assert_index(
+            UserConsent.objects.filter(type=UserConsent.ConsentType.SURVEY.value)
+            .select_related("user")
+            .order_by("id"),
+            "userconsent_type_id",
+        )
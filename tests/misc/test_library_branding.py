@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from tests.base import BaseUnitTest
+from virtual_library_card.library_branding import LibraryBranding, library_branding
+from virtuallibrarycard.models import LibraryPlace, Place
+
+
+class TestLibraryBranding(BaseUnitTest):
+    def test_from_library(self):
+        library = self.create_library(
+            social_facebook="fb", social_twitter="tw", places=["NY", "AL"]
+        )
+        branding = LibraryBranding.from_library(library)
+
+        assert branding.identifier == library.identifier
+        assert branding.name == library.name
+        assert branding.phone == library.phone
+        assert branding.email == library.email
+        assert branding.social_facebook == "fb"
+        assert branding.social_twitter == "tw"
+        assert branding.logo_header == library.logo_header()
+        assert branding.places == ("NY", "AL")
+        assert branding.terms_conditions_url == library.terms_conditions_url
+        assert branding.privacy_url == library.privacy_url
+
+    def test_get_cached(self):
+        library = self.create_library()
+        branding = LibraryBranding.get(library.identifier)
+        assert branding == LibraryBranding.from_library(library)
+
+        # A cache hit does not touch the database
+        with CaptureQueriesContext(connection) as queries:
+            assert LibraryBranding.get(library.identifier) == branding
+        assert len(queries) == 0
+
+    def test_get_missing(self):
+        assert LibraryBranding.get(None) is None
+        assert LibraryBranding.get("") is None
+        assert LibraryBranding.get("not-a-library") is None
+
+    def test_invalidated_on_change(self):
+        library = self.create_library(places=["NY"])
+        assert LibraryBranding.get(library.identifier).name == library.name
+
+        library.name = "A new name"
+        library.save()
+        assert LibraryBranding.get(library.identifier).name == "A new name"
+
+        LibraryPlace.associate(library, "AL")
+        assert LibraryBranding.get(library.identifier).places == ("NY", "AL")
+
+        place = Place.by_abbreviation("AL")
+        place.abbreviation = "ALX"
+        place.save()
+        assert LibraryBranding.get(library.identifier).places == ("NY", "ALX")
+
+        identifier = library.identifier
+        library.delete()
+        assert (
+            cache.get(
+                LibraryBranding.cache_key(identifier), version=LibraryBranding.VERSION
+            )
+            is None
+        )
+        assert LibraryBranding.get(identifier) is None
+
+    def test_context_processor(self):
+        request = RequestFactory().get("/")
+        request.session = {"identifier": self._default_library.identifier}
+        context = library_branding(request)
+        assert context["library_branding"] == LibraryBranding.get(
+            self._default_library.identifier
+        )
+
+        request.session = {}
+        assert library_branding(request) == {"library_branding": None}
+
+        # No session middleware at all, eg. API requests
+        request = mock.MagicMock(spec=[])
+        assert library_branding(request) == {"library_branding": None}
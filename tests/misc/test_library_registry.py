@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.base import BaseUnitTest
+from virtual_library_card.library_branding import LibraryBranding
+from virtual_library_card.library_registry import LibraryRegistry
+
+
+class TestLibraryRegistry(BaseUnitTest):
+    def test_get(self):
+        library = self.create_library()
+
+        result = LibraryRegistry.get(library.identifier)
+        assert result == library
+        assert result.name == library.name
+
+        # Subsequent lookups are served from the process local tier
+        with CaptureQueriesContext(connection) as queries:
+            assert LibraryRegistry.get(library.identifier) == library
+        assert len(queries) == 0
+
+        # Callers get their own copy
+        result.name = "changed"
+        assert LibraryRegistry.get(library.identifier).name == library.name
+
+    def test_get_missing(self):
+        assert LibraryRegistry.get(None) is None
+        assert LibraryRegistry.get("") is None
+        assert LibraryRegistry.get("not-a-library") is None
+        assert cache.get(LibraryRegistry.cache_key("not-a-library")) is None
+
+    def test_shared_tier(self):
+        library = self.create_library()
+        LibraryRegistry.get(library.identifier)
+
+        # Another process would only have the shared cache
+        LibraryRegistry.clear_local()
+        with CaptureQueriesContext(connection) as queries:
+            assert LibraryRegistry.get(library.identifier) == library
+        assert len(queries) == 0
+
+    def test_local_tier_expires(self):
+        library = self.create_library()
+        LibraryRegistry.get(library.identifier)
+
+        with mock.patch(
+            "virtual_library_card.library_registry.time.monotonic",
+            return_value=10**12,
+        ):
+            cache.delete(LibraryRegistry.cache_key(library.identifier))
+            with CaptureQueriesContext(connection) as queries:
+                assert LibraryRegistry.get(library.identifier) == library
+            assert len(queries) == 1
+
+    def test_invalidated_on_change(self):
+        library = self.create_library()
+        assert LibraryRegistry.get(library.identifier).name == library.name
+
+        library.name = "A new name"
+        library.save()
+        assert LibraryRegistry.get(library.identifier).name == "A new name"
+
+        # A changed identifier drops the old entries
+        old_identifier = library.identifier
+        LibraryBranding.get(old_identifier)
+        library.identifier = "newidentifier"
+        library.save()
+        assert LibraryRegistry.get(old_identifier) is None
+        assert LibraryBranding.get(old_identifier) is None
+        assert LibraryRegistry.get("newidentifier") == library
+
+        library.delete()
+        assert LibraryRegistry.get("newidentifier") is None
@@ -0,0 +1,149 @@
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client, override_settings
+
+from tests.base import BaseUnitTest, MockThread
+from virtuallibrarycard.management.commands.loadscenario import (
+    LIBRARY_IDENTIFIER,
+    prepare,
+)
+from virtuallibrarycard.models import CustomUser, Library
+
+
+class ClientResponse:
+    """The parts of a requests.Response the scenario reads"""
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.text = response.content.decode()
+
+
+class ClientSession:
+    """A requests.Session sending its requests through the Django test client"""
+
+    def __init__(self):
+        self.client = Client()
+
+    @property
+    def cookies(self):
+        return {name: morsel.value for name, morsel in self.client.cookies.items()}
+
+    @staticmethod
+    def _path(url: str) -> str:
+        url = urlsplit(url)
+        return f"{url.path}?{url.query}" if url.query else url.path
+
+    def get(self, url, allow_redirects=True, **kwargs):
+        return ClientResponse(self.client.get(self._path(url), follow=allow_redirects))
+
+    def post(self, url, data=None, allow_redirects=True, files=None, **kwargs):
+        data = dict(data or {})
+        for field, (name, content) in (files or {}).items():
+            data[field] = SimpleUploadedFile(name, content.encode())
+        return ClientResponse(
+            self.client.post(self._path(url), data, follow=allow_redirects)
+        )
+
+
+# The scenario signs in on most tasks, a fast hasher keeps the test short
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class TestLoadScenario(BaseUnitTest):
+    def setup_method(self, request):
+        super().setup_method(request)
+        location = dict(
+            adminArea1="US", adminArea3="NY", adminArea4="County", adminArea5="City"
+        )
+        for patch in [
+            mock.patch(
+                "virtuallibrarycard.management.commands.loadscenario.requests.Session",
+                ClientSession,
+            ),
+            mock.patch(
+                "virtuallibrarycard.management.commands.loadscenario.threading.Thread",
+                MockThread,
+            ),
+            mock.patch(
+                "virtuallibrarycard.business_rules.library_card.Thread", MockThread
+            ),
+            mock.patch(
+                "virtuallibrarycard.views.views_library_card.Geolocalize.get_user_location",
+                return_value={"results": [{"locations": [location]}]},
+            ),
+        ]:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_loadscenario(self):
+        out = StringIO()
+        call_command(
+            "loadscenario",
+            "--users",
+            "1",
+            "--requests",
+            "40",
+            "--patrons",
+            "3",
+            "--seed",
+            "1",
+            stdout=out,
+        )
+        header, *rows = out.getvalue().splitlines()
+        assert header.split()[:3] == ["task", "requests", "failures"]
+        report = {row.split()[0]: row.split()[1:] for row in rows}
+        assert report["total"][0] == "40"
+        assert all(failures == "0" for _, failures, *_ in report.values())
+
+    def test_every_task(self):
+        prepare(1, "NY")
+        staff = CustomUser(
+            email="staff@example.com",
+            first_name="Staff",
+            library=Library.objects.get(identifier=LIBRARY_IDENTIFIER),
+            is_staff=True,
+        )
+        staff.set_password("staff-password")
+        staff.save()
+
+        out = StringIO()
+        for task in ["signup", "card_request", "bulk_upload", "login", "profile"]:
+            call_command(
+                "loadscenario",
+                "--requests",
+                "2",
+                "--users",
+                "1",
+                "--task",
+                task,
+                "--staff-email",
+                staff.email,
+                "--staff-password",
+                "staff-password",
+                stdout=out,
+            )
+        rows = [row.split() for row in out.getvalue().splitlines()]
+        report = {row[0]: row[1:3] for row in rows if row[0] != "task"}
+        assert report == {
+            "signup": ["2", "0"],
+            "card_request": ["2", "0"],
+            "bulk_upload": ["2", "0"],
+            "login": ["2", "0"],
+            "profile": ["2", "0"],
+            "total": ["2", "0"],
+        }
+
+    def test_no_staff(self):
+        out = StringIO()
+        call_command("loadscenario", "--requests", "20", "--users", "1", stdout=out)
+        tasks = {row.split()[0] for row in out.getvalue().splitlines()}
+        assert "bulk_upload" not in tasks
+        assert not CustomUser.objects.filter(
+            email__endswith="@loadtest.example.com", is_staff=True
+        ).exists()
+
+        with self.assertRaises(CommandError):
+            call_command("loadscenario", "--task", "bulk_upload", stdout=out)
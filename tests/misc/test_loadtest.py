@@ -0,0 +1,26 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from tests.base import BaseUnitTest
+
+
+class TestLoadTest(BaseUnitTest):
+    def test_loadtest(self):
+        out = StringIO()
+        call_command(
+            "loadtest",
+            "--requests",
+            "6",
+            "--concurrency",
+            "2",
+            "--conn-max-age",
+            "60",
+            stdout=out,
+        )
+        closed, persistent = out.getvalue().splitlines()
+        # A connection per request, then one per thread
+        assert closed.startswith("CONN_MAX_AGE=0: 6 requests, 6 connections opened")
+        assert persistent.startswith(
+            "CONN_MAX_AGE=60: 6 requests, 2 connections opened"
+        )
@@ -0,0 +1,126 @@
+import json
+import logging
+import queue
+from logging.handlers import BufferingHandler
+from unittest import mock
+
+from virtual_library_card.logging import JsonFormatter, QueueHandler, SamplingFilter
+
+
+def make_record(
+    name="app", level=logging.INFO, msg="message %s", args=("arg",), **kwargs
+):
+    return logging.makeLogRecord(
+        dict(
+            name=name,
+            levelno=level,
+            levelname=logging.getLevelName(level),
+            msg=msg,
+            args=args,
+            **kwargs,
+        )
+    )
+
+
+class TestJsonFormatter:
+    def test_format(self):
+        record = make_record(timings_ms={"view": 1.5})
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "app"
+        assert entry["message"] == "message arg"
+        assert entry["timings_ms"] == {"view": 1.5}
+        assert entry["time"].endswith("+00:00")
+        assert "exception" not in entry
+
+    def test_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError as e:
+            record = make_record(exc_info=(type(e), e, e.__traceback__))
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["exception"].endswith("ValueError: boom")
+        assert "\n" not in JsonFormatter().format(record)
+
+
+class TestSamplingFilter:
+    def test_sampling(self):
+        sampling = SamplingFilter({"app.pintest": 10})
+        kept = [
+            record
+            for record in (make_record(name="app.pintest.view") for _ in range(30))
+            if sampling.filter(record)
+        ]
+        assert len(kept) == 3
+        assert all(record.sampled == 10 for record in kept)
+
+        # The warnings and the other loggers are kept
+        assert all(
+            sampling.filter(make_record(name="app.pintest", level=logging.WARNING))
+            for _ in range(5)
+        )
+        assert all(sampling.filter(make_record(name="app")) for _ in range(5))
+        assert all(sampling.filter(make_record(name="app.pintests")) for _ in range(5))
+
+
+class TestQueueHandler:
+    def test_queue(self):
+        target = BufferingHandler(100)
+        handler = QueueHandler(queue.SimpleQueue(), target)
+        logger = logging.getLogger("tests.queue")
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            arguments = ["first"]
+            logger.info("arguments %s", arguments)
+            # The message is formatted when queued
+            arguments.append("second")
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed")
+        finally:
+            logger.removeHandler(handler)
+            handler.stop()
+
+        queued, failed = target.buffer
+        assert queued.getMessage() == "arguments ['first']"
+        assert failed.exc_info is None
+        assert failed.exc_text.endswith("ValueError: boom")
+
+    def test_fork(self):
+        target = BufferingHandler(100)
+        handler = QueueHandler(queue.SimpleQueue(), target)
+        handler.handle(make_record())
+        parent_listener = handler.listener
+
+        # The listener thread is not copied in the forked process, another one is started
+        with mock.patch("os.getpid", return_value=-1):
+            handler.handle(make_record())
+            try:
+                assert handler.listener is not parent_listener
+                assert handler.listener.handlers == (target,)
+            finally:
+                handler.stop()
+        parent_listener.stop()
+        assert len(target.buffer) == 2
+
+    @mock.patch("virtual_library_card.logging.atexit")
+    def test_stop(self, mock_atexit: mock.MagicMock):
+        target = BufferingHandler(100)
+        handler = QueueHandler(queue.SimpleQueue(), target)
+        # Not started yet
+        handler.stop()
+
+        handler.handle(make_record())
+        mock_atexit.register.assert_called_once_with(handler.stop)
+        handler.stop()
+        mock_atexit.unregister.assert_called_with(handler.stop)
+        assert len(target.buffer) == 1
+        # Already stopped, eg. by the exit handler after a test
+        handler.stop()
+
+        # The next record starts the listener again
+        handler.handle(make_record())
+        handler.stop()
+        assert len(target.buffer) == 2
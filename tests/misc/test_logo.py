@@ -0,0 +1,120 @@
+from io import BytesIO
+from unittest import mock
+
+from PIL import Image
+
+from virtual_library_card.logo import LibraryLogo
+
+
+class TestLibraryLogo:
+    def _image(self, width, height, image_format="PNG") -> bytes:
+        output = BytesIO()
+        Image.new("RGB", (width, height), "red").save(output, format=image_format)
+        return output.getvalue()
+
+    def test_resize(self):
+        image = Image.new("RGBA", (1000, 500), "red")
+        assert LibraryLogo.resize(image, 200).size == (200, 100)
+        # Smaller images are not scaled up
+        small = Image.new("RGBA", (50, 20), "red")
+        assert LibraryLogo.resize(small, 200) is small
+
+    def test_encode(self):
+        image = Image.new("RGBA", (360, 180), "red")
+        encoded = Image.open(BytesIO(LibraryLogo.encode(image)))
+        assert (encoded.format, encoded.size) == ("PNG", (360, 180))
+        encoded = Image.open(BytesIO(LibraryLogo.encode(image, "WEBP")))
+        assert (encoded.format, encoded.size) == ("WEBP", (360, 180))
+
+    @mock.patch("virtual_library_card.logo.default_storage")
+    def test_build_variants_decodes_once(self, mock_storage: mock.MagicMock):
+        mock_storage.save.side_effect = lambda name, content: name
+        with (
+            mock.patch(
+                "virtual_library_card.logo.Image.open", wraps=Image.open
+            ) as mock_open,
+            mock.patch.object(
+                LibraryLogo, "resize", wraps=LibraryLogo.resize
+            ) as mock_resize,
+        ):
+            LibraryLogo.build_variants(
+                "library/logo_x.jpg", self._image(1000, 500, "JPEG")
+            )
+        assert mock_open.call_count == 1
+        assert mock_resize.call_count == len(LibraryLogo.VARIANT_WIDTHS)
+        assert mock_storage.save.call_count == len(LibraryLogo.VARIANT_WIDTHS) * len(
+            LibraryLogo.FORMATS
+        )
+
+    def test_variant_name(self):
+        assert (
+            LibraryLogo.variant_name("library/logo_lyra.jpg", "thumbnail")
+            == "library/logo_lyra_thumbnail.png"
+        )
+        assert (
+            LibraryLogo.variant_name("library/logo_lyra.jpg", "header", "webp")
+            == "library/logo_lyra_header.webp"
+        )
+
+    @mock.patch("virtual_library_card.logo.default_storage")
+    def test_build_variants(self, mock_storage: mock.MagicMock):
+        mock_storage.url.side_effect = lambda name: f"http://storage/{name}"
+        mock_storage.save.side_effect = lambda name, content: name
+
+        # Without content only the original url is known
+        assert LibraryLogo.build_variants("library/logo_x.png") == {
+            "source": "library/logo_x.png",
+            "original": "http://storage/library/logo_x.png",
+        }
+        assert mock_storage.save.call_count == 0
+
+        variants = LibraryLogo.build_variants(
+            "library/logo_x.png", self._image(1000, 1000)
+        )
+        assert variants == {
+            "source": "library/logo_x.png",
+            "original": "http://storage/library/logo_x.png",
+            "thumbnail": "http://storage/library/logo_x_thumbnail.png",
+            "thumbnail_webp": "http://storage/library/logo_x_thumbnail.webp",
+            "header": "http://storage/library/logo_x_header.png",
+            "header_webp": "http://storage/library/logo_x_header.webp",
+        }
+
+        # Previous variants of the same logo are replaced
+        assert {c.args[0] for c in mock_storage.delete.call_args_list} == {
+            c.args[0] for c in mock_storage.save.call_args_list
+        }
+        saved = {
+            c.args[0]: Image.open(c.args[1]) for c in mock_storage.save.call_args_list
+        }
+        assert {name: (image.format, image.size) for name, image in saved.items()} == {
+            "library/logo_x_thumbnail.png": ("PNG", (200, 200)),
+            "library/logo_x_thumbnail.webp": ("WEBP", (200, 200)),
+            "library/logo_x_header.png": ("PNG", (360, 360)),
+            "library/logo_x_header.webp": ("WEBP", (360, 360)),
+        }
+
+    @mock.patch("virtual_library_card.logo.default_storage")
+    def test_delete_variants(self, mock_storage: mock.MagicMock):
+        LibraryLogo.delete_variants(
+            {
+                "source": "library/logo_x.png",
+                "original": "http://storage/library/logo_x.png",
+                "thumbnail": "http://storage/library/logo_x_thumbnail.png",
+                "header_webp": "http://storage/library/logo_x_header.webp",
+            }
+        )
+        assert mock_storage.delete.call_args_list == [
+            mock.call("library/logo_x_thumbnail.png"),
+            mock.call("library/logo_x_header.webp"),
+        ]
+
+    @mock.patch("virtual_library_card.logo.default_storage")
+    def test_build_variants_bad_image(self, mock_storage: mock.MagicMock):
+        mock_storage.url.side_effect = lambda name: f"http://storage/{name}"
+        variants = LibraryLogo.build_variants("library/logo_x.png", b"not an image")
+        assert variants == {
+            "source": "library/logo_x.png",
+            "original": "http://storage/library/logo_x.png",
+        }
+        assert mock_storage.save.call_count == 0
@@ -0,0 +1,138 @@
+import tempfile
+from unittest import mock
+
+from django.test import Client, override_settings
+from prometheus_client import REGISTRY
+
+from tests.base import BaseUnitTest
+from virtual_library_card.geoloc import Geolocalize
+from virtual_library_card.library_registry import LibraryRegistry
+from virtual_library_card.metrics import UNMATCHED_VIEW, outbound, record_cache_lookup
+
+
+def sample(name, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_ENABLED=True)
+class TestMetrics(BaseUnitTest):
+    def test_requests(self):
+        view = "PATRONAPI/<number>/<pin>/pintest"
+        labels = dict(method="GET", view=view, status="200")
+        requests = sample("vlc_requests_total", **labels)
+        queries = sample("vlc_request_db_queries_sum", view=view)
+
+        response = Client().get(f"/PATRONAPI/{self._default_card.number}/xxx/pintest")
+        assert response.status_code == 200
+
+        assert sample("vlc_requests_total", **labels) == requests + 1
+        assert sample("vlc_request_duration_seconds_count", view=view) >= 1
+        # The card and the user
+        assert sample("vlc_request_db_queries_sum", view=view) >= queries + 2
+
+        # Unknown URLs share a single label
+        Client().get("/does/not/exist")
+        assert sample(
+            "vlc_requests_total", method="GET", view=UNMATCHED_VIEW, status="404"
+        )
+
+    def test_pintest_results(self):
+        wrong_pin = sample("vlc_pintest_results_total", retcod="1", errnum="4")
+        missing = sample("vlc_pintest_results_total", retcod="1", errnum="100000")
+
+        Client().get(f"/PATRONAPI/{self._default_card.number}/xxx/pintest")
+        Client().post("/PATRONAPI/pintest", {"number": self._default_card.number})
+
+        assert (
+            sample("vlc_pintest_results_total", retcod="1", errnum="4") == wrong_pin + 1
+        )
+        assert (
+            sample("vlc_pintest_results_total", retcod="1", errnum="100000")
+            == missing + 1
+        )
+
+    def test_cache_lookups(self):
+        identifier = self._default_library.identifier
+        LibraryRegistry.invalidate(identifier)
+        local_misses = sample(
+            "vlc_cache_lookups_total", cache="library_registry_local", result="miss"
+        )
+        local_hits = sample(
+            "vlc_cache_lookups_total", cache="library_registry_local", result="hit"
+        )
+
+        LibraryRegistry.get(identifier)
+        LibraryRegistry.get(identifier)
+
+        assert (
+            sample(
+                "vlc_cache_lookups_total",
+                cache="library_registry_local",
+                result="miss",
+            )
+            == local_misses + 1
+        )
+        assert (
+            sample(
+                "vlc_cache_lookups_total", cache="library_registry_local", result="hit"
+            )
+            == local_hits + 1
+        )
+
+    def test_outbound(self):
+        errors = sample(
+            "vlc_outbound_duration_seconds_count", service="mapquest", outcome="error"
+        )
+        with mock.patch("urllib.request.urlopen", side_effect=OSError("timeout")):
+            assert Geolocalize.get_user_location("1", "2") is None
+        assert (
+            sample(
+                "vlc_outbound_duration_seconds_count",
+                service="mapquest",
+                outcome="error",
+            )
+            == errors + 1
+        )
+
+        with outbound("test"):
+            pass
+        assert sample(
+            "vlc_outbound_duration_seconds_count", service="test", outcome="success"
+        )
+
+    def test_disabled(self):
+        labels = dict(service="disabled", outcome="success")
+        wrong_pin = sample("vlc_pintest_results_total", retcod="1", errnum="4")
+        with override_settings(METRICS_ENABLED=False):
+            with outbound("disabled"):
+                pass
+            record_cache_lookup("disabled", True)
+            response = Client().get(
+                f"/PATRONAPI/{self._default_card.number}/xxx/pintest"
+            )
+        assert response.status_code == 200
+        assert not sample("vlc_outbound_duration_seconds_count", **labels)
+        assert not sample("vlc_cache_lookups_total", cache="disabled", result="hit")
+        assert sample("vlc_pintest_results_total", retcod="1", errnum="4") == wrong_pin
+
+    def test_endpoint(self):
+        Client().get("/version.json")
+        response = Client().get("/metrics")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        assert b'vlc_requests_total{method="GET",status="200",view="version.json"}' in (
+            response.content
+        )
+
+        with override_settings(METRICS_ENABLED=False):
+            assert Client().get("/metrics").status_code == 404
+
+    def test_multiprocess(self):
+        # The metrics are read from the workers' files, none were written in this directory
+        with (
+            tempfile.TemporaryDirectory() as directory,
+            mock.patch.dict("os.environ", {"PROMETHEUS_MULTIPROC_DIR": directory}),
+        ):
+            response = Client().get("/metrics")
+        assert response.status_code == 200
+        assert response.content == b""
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.test import Client, override_settings
+
+from tests.base import BaseUnitTest
+
+
+class TestStatelessRoutes(BaseUnitTest):
+    def test_api_routes(self):
+        client = Client()
+        client.force_login(self._default_user)
+
+        for path in (
+            f"/PATRONAPI/{self._default_card.number}/xxx/pintest",
+            f"/api/{self._default_card.number}/dump",
+            "/version.json",
+        ):
+            response = client.get(path)
+            assert response.status_code == 200
+            request = response.wsgi_request
+            # No session, so the logged in user is not loaded
+            assert not hasattr(request, "session")
+            assert request.user.is_anonymous
+            assert not hasattr(request, "_messages")
+            assert not hasattr(request, "LANGUAGE_CODE")
+            assert "Vary" not in response
+
+    def test_website_routes(self):
+        client = Client()
+        client.force_login(self._default_user)
+
+        response = client.get("/accounts/profile/")
+        assert response.status_code == 200
+        request = response.wsgi_request
+        assert request.user == self._default_user
+        assert request.session.session_key
+        assert request.LANGUAGE_CODE == "en"
+
+
+class TestMiddlewareTiming(BaseUnitTest):
+    def test_timing(self):
+        with override_settings(MIDDLEWARE_TIMING=True):
+            response = Client().get("/version.json")
+
+        timings = dict(
+            timing.split(";dur=") for timing in response["Server-Timing"].split(", ")
+        )
+        assert list(timings) == [
+            "SecurityMiddleware",
+            "SessionMiddleware",
+            "LocaleMiddleware",
+            "CommonMiddleware",
+            "CsrfViewMiddleware",
+            "AuthenticationMiddleware",
+            "MessageMiddleware",
+            "XFrameOptionsMiddleware",
+            "ReplicaRouterMiddleware",
+            "view",
+        ]
+        assert all(float(duration) >= 0 for duration in timings.values())
+
+    def test_log(self):
+        with (
+            override_settings(MIDDLEWARE_TIMING=True),
+            mock.patch("virtual_library_card.middleware.timing_log") as timing_log,
+        ):
+            Client().get(f"/PATRONAPI/{self._default_card.number}/secretpin/pintest")
+
+        message, method, view, timings = timing_log.info.call_args.args
+        # The route is logged, not the PIN in the path
+        assert (method, view) == ("GET", "PATRONAPI/<number>/<pin>/pintest")
+        assert "secretpin" not in timings
+        assert (
+            list(timing_log.info.call_args.kwargs["extra"]["timings_ms"])[-1] == "view"
+        )
+
+    def test_disabled(self):
+        response = Client().get("/version.json")
+        assert "Server-Timing" not in response
@@ -0,0 +1,40 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from virtuallibrarycard.management.commands.profileimports import (
+    PHASE_MARKER,
+    ImportTiming,
+    parse_importtime,
+)
+
+
+def test_parse_importtime():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   _io",
+            f"{PHASE_MARKER} setup",
+            "import time:       300 |       1500 |     django.db",
+            "Unrelated output",
+            f"{PHASE_MARKER} urls",
+            "import time:        42 |         42 | virtuallibrarycard.views.views_api",
+        ]
+    )
+    assert parse_importtime(output) == [
+        ImportTiming("_io", "startup", 120, 120),
+        ImportTiming("django.db", "setup", 300, 1500),
+        ImportTiming("virtuallibrarycard.views.views_api", "urls", 42, 42),
+    ]
+
+
+def test_profileimports():
+    out = StringIO()
+    call_command(
+        "profileimports", "--limit", "5", "--prefix", "virtuallibrarycard", stdout=out
+    )
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Settings: virtual_library_card.settings.dev"
+    assert lines[1].startswith("django.setup(): ")
+    modules = lines[-5:]
+    assert all(" virtuallibrarycard" in line for line in modules)
@@ -0,0 +1,113 @@
+import threading
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.urls import resolve
+
+from tests.base import BaseUnitTest
+from virtual_library_card.query_inspector import (
+    QueryInspector,
+    QueryInspectorMiddleware,
+    query_shape,
+)
+from virtuallibrarycard.models import LibraryCard
+
+
+class TestQueryInspector(BaseUnitTest):
+    def test_query_shape(self):
+        assert (
+            query_shape('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "x" = %s')
+            == 'SELECT * FROM "t" WHERE "id" IN (...) AND "x" = %s'
+        )
+        assert query_shape('SELECT * FROM "t" WHERE "id" IN (%s)') == (
+            'SELECT * FROM "t" WHERE "id" IN (...)'
+        )
+
+    def test_repeated(self):
+        for _ in range(2):
+            self.create_library_card(self._default_user, self._default_library)
+
+        with QueryInspector() as inspector:
+            for card in LibraryCard.objects.all():
+                card.library.name
+
+        [repeated] = inspector.repeated(3)
+        assert repeated.count == 3
+        assert '"virtuallibrarycard_library"' in repeated.shape
+        [origin] = repeated.origins
+        assert origin.startswith("tests/misc/test_query_inspector.py:")
+        assert origin.endswith(" in test_repeated")
+        assert inspector.repeated(4) == []
+        # No request was handled
+        assert inspector.by_request() == []
+
+    def test_slow(self):
+        with (
+            QueryInspector() as inspector,
+            mock.patch("time.perf_counter", side_effect=[0, 0.2]),
+        ):
+            LibraryCard.objects.count()
+        [slow] = inspector.slow(100)
+        assert slow.duration == 0.2
+        assert "200ms SELECT COUNT(*)" in inspector.report(5, 100)
+
+    def test_by_request(self):
+        with QueryInspector() as inspector:
+            self.create_library_card(self._default_user, self._default_library)
+            Client().get(f"/PATRONAPI/{self._default_card.number}/dump")
+            Client().get(f"/PATRONAPI/{self._default_card.number}/dump")
+
+        first, second = inspector.by_request()
+        assert len(first.queries) == len(second.queries) > 0
+        assert len(inspector.queries) > len(first.queries) + len(second.queries)
+
+    def test_other_threads(self):
+        def other_request():
+            try:
+                Client().get(f"/PATRONAPI/{self._default_card.number}/dump")
+            finally:
+                connections.close_all()
+
+        with QueryInspector() as inspector:
+            # The request of another thread, eg. in a threaded server
+            thread = threading.Thread(target=other_request)
+            thread.start()
+            thread.join()
+            LibraryCard.objects.count()
+
+        assert inspector.by_request() == []
+        [query] = inspector.queries
+        assert query.request is None
+
+    def test_middleware(self):
+        for _ in range(2):
+            self.create_library_card(self._default_user, self._default_library)
+
+        def view(request):
+            names = [card.library.name for card in LibraryCard.objects.all()]
+            return HttpResponse(", ".join(names))
+
+        request = RequestFactory().get(f"/PATRONAPI/{self._default_card.number}/dump")
+        request.resolver_match = resolve("/version.json")
+        with (
+            override_settings(QUERY_INSPECTOR=True, QUERY_INSPECTOR_REPEATS=3),
+            mock.patch("virtual_library_card.query_inspector.log") as log,
+        ):
+            QueryInspectorMiddleware(view)(request)
+
+            args, _ = log.warning.call_args
+            message = args[0] % args[1:]
+            # The route, not the path holding the PIN of a pintest
+            assert message.startswith("GET version.json ran 4 queries:\n3x SELECT")
+            assert "in view" in message
+
+            with override_settings(QUERY_INSPECTOR_REPEATS=4):
+                log.reset_mock()
+                QueryInspectorMiddleware(view)(request)
+                log.warning.assert_not_called()
+
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInspectorMiddleware(view)
@@ -2,9 +2,15 @@ from datetime import UTC, datetime
 from unittest import mock
 
 from datedelta import datedelta
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from tests.base import BaseUnitTest
+from virtual_library_card.library_branding import LibraryBranding
 from virtual_library_card.user_session import UserSessionManager
+from virtuallibrarycard.business_rules.library_card import LibraryCardRules
+from virtuallibrarycard.models import LibraryCard
 
 
 class TestUserSessionManager(BaseUnitTest):
@@ -17,15 +23,29 @@ class TestUserSessionManager(BaseUnitTest):
         request = mock.MagicMock()
         request.session = dict()
         UserSessionManager.set_request_session_library(request, library)
-        assert request.session["library_phone"] == library.phone
-        assert request.session["identifier"] == library.identifier
-        assert request.session["library_name"] == library.name
-        assert request.session["social_facebook"] == library.social_facebook
-        assert request.session["social_twitter"] == library.social_twitter
-        assert request.session["email"] == library.email
-        assert request.session["places"] == ["NY"]
-        assert request.session["terms_conditions_url"] == library.terms_conditions_url
-        assert request.session["privacy_url"] == library.privacy_url
+
+        # Only the identifier is stored, the branding is cached
+        assert request.session == {"identifier": library.identifier}
+        branding = cache.get(
+            LibraryBranding.cache_key(library.identifier),
+            version=LibraryBranding.VERSION,
+        )
+        assert branding["phone"] == library.phone
+        assert branding["name"] == library.name
+        assert branding["social_facebook"] == library.social_facebook
+        assert branding["social_twitter"] == library.social_twitter
+        assert branding["email"] == library.email
+        assert branding["places"] == ("NY",)
+        assert branding["terms_conditions_url"] == library.terms_conditions_url
+        assert branding["privacy_url"] == library.privacy_url
+
+    def test_set_request_session_library_unchanged(self):
+        request = mock.MagicMock()
+        request.session = mock.MagicMock()
+        request.session.get.return_value = self._default_library.identifier
+        UserSessionManager.set_request_session_library(request, self._default_library)
+        # The session is not written to when the library is the same
+        assert request.session.__setitem__.call_count == 0
 
     def test_clean_session_data(self):
         request = mock.MagicMock()
@@ -58,11 +78,29 @@ class TestUserSessionManager(BaseUnitTest):
         future_card.expiration_date = datetime.now(UTC) + datedelta(days=1)
         future_card.save()
 
+        cancelled_card = self.create_library_card(user, self._default_library)
+        cancelled_card.canceled_date = datetime.now(UTC)
+        cancelled_card.save()
+
         context = {}
+        with CaptureQueriesContext(connection) as queries:
+            UserSessionManager.set_context_library_cards(context, user)
+            assert set(context["library_cards"]) == {card, future_card}
+            assert context["nb_library_cards"] == 2
+            assert context["library_cards"].count() == 2
+        # The count does not query the cards again
+        assert len(queries) == 1
+
+        # A card reaching its expiration date is active until the sweeper marks it
+        LibraryCard.objects.filter(id=future_card.id).update(
+            expiration_date=datetime.now(UTC) - datedelta(days=1)
+        )
         UserSessionManager.set_context_library_cards(context, user)
-
         assert set(context["library_cards"]) == {card, future_card}
-        assert context["nb_library_cards"] == 2
+
+        LibraryCardRules.expire_cards()
+        UserSessionManager.set_context_library_cards(context, user)
+        assert set(context["library_cards"]) == {card}
 
     def test_set_session_info(self):
         arg = mock.MagicMock()
@@ -71,7 +109,7 @@ class TestUserSessionManager(BaseUnitTest):
         result = UserSessionManager.set_session_info(arg)
 
         assert result == self._default_library.identifier
-        assert len(arg.request.session.keys()) == 10
+        assert len(arg.request.session.keys()) == 1
 
         arg.request.session = {}
         arg.request.GET = {"identifier": "someidentifier"}
@@ -86,14 +124,14 @@ class TestUserSessionManager(BaseUnitTest):
         UserSessionManager.set_session_identifier_info(
             arg, self._default_library.identifier
         )
-        assert len(arg.request.session.keys()) == 10
+        assert len(arg.request.session.keys()) == 1
         assert arg.request.session["identifier"] == self._default_library.identifier
 
         # Alternative identifier within request
         arg.request.session = {}
         arg.request.GET = {"identifier": self._default_library.identifier}
         UserSessionManager.set_session_identifier_info(arg, None)
-        assert len(arg.request.session.keys()) == 10
+        assert len(arg.request.session.keys()) == 1
         assert arg.request.session["identifier"] == self._default_library.identifier
 
         # No identifiers
@@ -1,7 +1,7 @@
 import random
 from datetime import UTC, datetime
 from enum import Enum
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import django
 import pytest
@@ -10,6 +10,8 @@ from django.conf import settings
 from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_save
 from django.db.utils import IntegrityError
 from django.templatetags.static import static
 from django.utils import timezone
@@ -91,6 +93,77 @@ class TestLibraryModel(BaseUnitTest):
         library.logo = None
         assert library.logo_url() == static("images/logo.png")
 
+    def test_logo_variants(self):
+        library = self.create_library(logo="library/somelogo.png")
+        assert library.logo_variants == {
+            "source": "library/somelogo.png",
+            "original": default_storage.url("library/somelogo.png"),
+        }
+        # No thumbnail without the file content, the original is used
+        assert library.logo_thumbnail_url() == library.logo_url()
+
+        # Stored urls are not used once the logo changes
+        library.logo = "library/otherlogo.png"
+        assert library.logo_url() == default_storage.url("library/otherlogo.png")
+
+        library.logo = None
+        library.save()
+        assert library.logo_variants == {}
+
+    @patch("virtuallibrarycard.models.LibraryLogo")
+    def test_logo_variants_uploaded(self, mock_logo: MagicMock):
+        mock_logo.build_variants.return_value = dict(
+            source="library/logo_uploaded.png",
+            original="http://original",
+            thumbnail="http://thumbnail",
+            thumbnail_webp="http://thumbnail.webp",
+            header="http://header",
+        )
+        with open("tests/files/logo.png", "rb") as f:
+            content = f.read()
+
+        library = self.create_library(identifier="uploaded")
+        # The mocked variants do not belong to the logo the library was created with
+        mock_logo.delete_variants.reset_mock()
+        library.logo = SimpleUploadedFile("logo.png", content)
+        saved = MagicMock()
+        post_save.connect(saved, sender=Library)
+        try:
+            library.save()
+        finally:
+            post_save.disconnect(saved, sender=Library)
+
+        assert mock_logo.build_variants.call_args == call(
+            "library/logo_uploaded.png", content
+        )
+        # The variants are saved along with the logo
+        assert saved.call_count == 1
+        library.refresh_from_db()
+        assert library.logo_variants == mock_logo.build_variants.return_value
+        assert library.logo_url() == "http://original"
+        assert library.logo_thumbnail_url() == "http://thumbnail"
+        assert library.logo_thumbnail() == (
+            '<picture><source srcset="http://thumbnail.webp" type="image/webp"/>'
+            f'<img alt="{library.name} logo" aria-label="{library.name} logo" src="http://thumbnail" width="100px"/>'
+            "</picture>"
+        )
+        # No webp variant, only the image
+        assert library.logo_header() == (
+            f'<img alt="{library.name} logo" aria-label="{library.name} logo" src="http://header" class="logo"/>'
+        )
+
+        # Saving again does not rebuild the variants
+        mock_logo.build_variants.reset_mock()
+        library.save()
+        assert mock_logo.build_variants.call_count == 0
+        assert mock_logo.delete_variants.call_count == 0
+
+        # The variants of a replaced logo are deleted
+        variants = library.logo_variants
+        library.logo = "library/otherlogo.png"
+        library.save()
+        assert mock_logo.delete_variants.call_args == call(variants)
+
     def test_state_name(self):
         """library.state_name() is Not really used anywhere but still testing for it"""
         library = self.create_library(places=["NY"])
@@ -344,6 +417,27 @@ class TestLibraryCardModel(BaseUnitTest):
         card.expiration_date = timezone.now() - datedelta(months=1)
         assert card.is_expired() == True
 
+    def test_status(self):
+        card = self._default_card
+        assert card.status == LibraryCard.Status.ACTIVE
+
+        card.expiration_date = timezone.now() - datedelta(days=1)
+        card.save(update_fields=["expiration_date"])
+        card.refresh_from_db()
+        assert card.status == LibraryCard.Status.EXPIRED
+
+        card.expiration_date = timezone.now() + datedelta(days=1)
+        card.save()
+        card.refresh_from_db()
+        assert card.status == LibraryCard.Status.ACTIVE
+
+        # Cancelled takes precedence over expired
+        card.canceled_date = timezone.now()
+        card.expiration_date = timezone.now() - datedelta(days=1)
+        card.save()
+        card.refresh_from_db()
+        assert card.status == LibraryCard.Status.CANCELLED
+
     def test_status_str(self):
         card = self._default_card
         # default
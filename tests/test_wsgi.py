@@ -1,6 +1,15 @@
+import random
+import string
 import unittest
+from unittest import mock
 
+from django.template import engines
+
+from virtual_library_card import wsgi
+from virtual_library_card.library_registry import LibraryRegistry
+from virtual_library_card.profanity import ProfanityWordList
 from virtual_library_card.wsgi import (
+    UNCENSORED_URI,
     CensorUriException,
     censor_password_from_pintest_uri,
 )
@@ -45,3 +54,166 @@ class TestCensorPassword(unittest.TestCase):
 
         uri = "/api/1234567890/secret/extra_param/pintest"
         self.assertRaises(CensorUriException, censor_password_from_pintest_uri, uri)
+
+    def test_variants(self):
+        for uri, expected in [
+            # Any casing of the prefix
+            (
+                "/patronapi/1234567890/secret/pintest",
+                "/patronapi/1234567890/***/pintest",
+            ),
+            (
+                "/PatronAPI/1234567890/secret/pintest",
+                "/PatronAPI/1234567890/***/pintest",
+            ),
+            ("/API/1234567890/secret/PINTEST", "/API/1234567890/***/PINTEST"),
+            ("/api/1234567890/secret/pintest/", "/api/1234567890/***/pintest/"),
+            # Query strings
+            ("/api/1234567890/secret/pintest?a=b", "/api/1234567890/***/pintest?a=b"),
+            (
+                "/api/1234567890/secret/pintest?pin=secret&a=b",
+                "/api/1234567890/***/pintest?pin=***&a=b",
+            ),
+            # The POST requests have no PIN in their path
+            ("/PATRONAPI/pintest", "/PATRONAPI/pintest"),
+            ("/api/pintest?number=1234&PIN=secret", "/api/pintest?number=1234&PIN=***"),
+        ]:
+            with self.subTest(uri=uri):
+                assert censor_password_from_pintest_uri(uri) == expected
+
+        for uri in [
+            "/api/1234567890/secret/pintest?",
+            "/api/1234567890/secret/pintest#",
+        ]:
+            assert "secret" not in censor_password_from_pintest_uri(uri)
+
+        with self.assertRaises(CensorUriException) as raised:
+            censor_password_from_pintest_uri("/api/1234567890/secret/pintest/extra")
+        # The exception is logged, it does not hold the uri
+        assert "secret" not in str(raised.exception)
+
+
+class TestCensorPasswordFuzz(unittest.TestCase):
+    """Random uris, built from the pieces of the pintest uris"""
+
+    PIECES = [
+        "/",
+        "?",
+        "&",
+        "#",
+        "=",
+        "api",
+        "PATRONAPI",
+        "pintest",
+        "pin",
+        "PIN",
+        "%2F",
+        "1234",
+        " ",
+        "\n",
+    ]
+
+    def setUp(self):
+        self.random = random.Random(4)
+
+    def random_text(self, alphabet=string.printable):
+        return "".join(self.random.choices(alphabet, k=self.random.randint(1, 12)))
+
+    def test_malformed(self):
+        for _ in range(5000):
+            uri = "".join(
+                self.random.choices(self.PIECES, k=self.random.randint(0, 10))
+            )
+            try:
+                censored = censor_password_from_pintest_uri(uri)
+            except CensorUriException:
+                assert "pintest" in uri.lower()
+                continue
+            if "pintest" not in uri.lower():
+                assert censored == uri
+
+    def test_pins_are_censored(self):
+        segment = (
+            string.ascii_letters
+            + string.digits
+            + string.punctuation.replace("/", "").replace("?", "").replace("#", "")
+        )
+        for _ in range(5000):
+            prefix = "".join(
+                self.random.choice([c.lower(), c.upper()])
+                for c in self.random.choice(["api", "patronapi"])
+            )
+            number = self.random_text(segment)
+            pin = "PIN" + self.random_text(segment)
+            query = self.random.choice(["", "?", f"?pin={pin}", f"?a=b&pin={pin}&c=d"])
+            uri = f"/{prefix}/{number}/{pin}/pintest{query}"
+
+            censored = censor_password_from_pintest_uri(uri)
+            path = f"/{prefix}/{number}/***/pintest"
+            assert censored.startswith(path)
+            assert pin not in censored[len(path) :]
+
+
+class TestUwsgiApp(unittest.TestCase):
+    def test_clean_uri(self):
+        with (
+            mock.patch.object(wsgi, "uwsgi", create=True) as uwsgi,
+            mock.patch.object(wsgi, "django_app") as django_app,
+            mock.patch.object(wsgi, "log") as log,
+        ):
+            for uri, clean_uri in [
+                ("/api/1234/secret/pintest", "/api/1234/***/pintest"),
+                ("/PATRONAPI/pintest", "/PATRONAPI/pintest"),
+                ("/admin/", "/admin/"),
+            ]:
+                wsgi.uwsgi_app({"REQUEST_URI": uri}, None)
+                uwsgi.set_logvar.assert_called_with("clean_uri", clean_uri)
+            log.warning.assert_not_called()
+
+            wsgi.uwsgi_app({"REQUEST_URI": "/api/secret/pintest"}, None)
+            uwsgi.set_logvar.assert_called_with("clean_uri", UNCENSORED_URI)
+            log.warning.assert_called_once()
+            assert django_app.call_count == 4
+
+
+class TestPreload(unittest.TestCase):
+    def test_uwsgi_preloads(self):
+        assert wsgi.uwsgi_preloads() is False
+
+        with (
+            mock.patch.object(wsgi, "UWSGI_PRESENT", True),
+            mock.patch.object(wsgi, "uwsgi", create=True) as uwsgi,
+        ):
+            uwsgi.opt = {}
+            assert wsgi.uwsgi_preloads() is True
+            uwsgi.opt = {"lazy-apps": b"0"}
+            assert wsgi.uwsgi_preloads() is True
+            uwsgi.opt = {"lazy-apps": b"1"}
+            assert wsgi.uwsgi_preloads() is False
+            uwsgi.opt = {"lazy": True}
+            assert wsgi.uwsgi_preloads() is False
+
+    @mock.patch.object(wsgi, "gc")
+    @mock.patch.object(wsgi, "connections")
+    def test_warm_up(self, connections, gc):
+        ProfanityWordList._ALL_CENSORED_WORDS = []
+        with mock.patch.object(
+            engines["jinja2"], "get_template", wraps=engines["jinja2"].get_template
+        ) as get_template:
+            wsgi.warm_up()
+
+        get_template.assert_any_call("api/pin_test.html")
+        assert ProfanityWordList._ALL_CENSORED_WORDS
+        connections.close_all.assert_called_once()
+        gc.disable.assert_called_once()
+        gc.freeze.assert_called_once()
+
+    @mock.patch.object(wsgi, "gc")
+    def test_after_fork(self, gc):
+        LibraryRegistry._local["identifier"] = (0, None)
+        with mock.patch.object(wsgi, "random") as random:
+            wsgi.after_fork()
+
+        gc.enable.assert_called_once()
+        random.seed.assert_called_once_with()
+        assert LibraryRegistry._local == {}
@@ -2,6 +2,7 @@ import json
 from datetime import UTC, datetime, timedelta
 from unittest import mock
 
+import pytest
 from django.core.handlers.wsgi import WSGIRequest
 from django.test import RequestFactory
 
@@ -10,9 +11,9 @@ from virtuallibrarycard.models import CustomUser, LibraryCard
 from virtuallibrarycard.views.views_api import (
     PinTestPOSTViewSet,
     PinTestViewSet,
-    PlaceSearchAheadView,
     UserLibraryCardViewSet,
 )
+from virtuallibrarycard.views.views_place import PlaceSearchAheadView
 
 
 class TestPinTestPOSTViewSet(BaseUnitTest):
@@ -124,6 +125,7 @@ class TestPinTestViewSet(BaseUnitTest):
         view.setup(request)
         return view
 
+    @pytest.mark.query_budget(7)
     def test_get_method(self):
         password = "apassword"
         view = self._setup_view(self._default_card, self._default_user, password)
@@ -140,6 +142,7 @@ class TestPinTestViewSet(BaseUnitTest):
         assert response.data["ERRNUM"] == 4
         assert response.data["ERRMSG"] == "Invalid patron PIN"
 
+    @pytest.mark.query_budget(5)
     def test_bad_card(self):
         password = "apassword"
         view = self._setup_view(self._default_card, self._default_user, password)
@@ -149,6 +152,7 @@ class TestPinTestViewSet(BaseUnitTest):
         assert response.data["ERRNUM"] == 1
         assert response.data["ERRMSG"] == "Requested record not found"
 
+    @pytest.mark.query_budget(10)
     def test_api(self):
         password = "apassword"
         self._default_user.set_password(password)
@@ -192,6 +196,7 @@ class TestUserLibraryCardViewSet(BaseUnitTest):
         view.setup(request)
         return view
 
+    @pytest.mark.query_budget(3)
     def test_get(self):
         view = self._setup_view(self._default_card)
         response = view.get(view.request, self._default_card.number)
@@ -208,6 +213,7 @@ class TestUserLibraryCardViewSet(BaseUnitTest):
         assert response.data["ERRNUM"] == 1
         assert response.data["ERRMSG"] == "Requested record not found"
 
+    @pytest.mark.query_budget(10)
     def test_api(self):
         card = self.create_library_card(
             self._default_user,
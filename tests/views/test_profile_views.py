@@ -1,3 +1,4 @@
+import pytest
 from django.test import RequestFactory
 from django.urls import reverse
 from pytest_django.asserts import assertFormError
@@ -8,6 +9,7 @@ from virtuallibrarycard.views.views_profile import ProfileDeleteView
 
 
 class TestProfileView(BaseUnitTest):
+    @pytest.mark.query_budget(24)
     def test_profile_view(self):
         user = self.create_user(self._default_library)
         l1 = self.create_library_card(user, user.library)
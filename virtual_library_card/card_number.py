@@ -3,9 +3,11 @@ import random
 from django.db import transaction
 
 import virtuallibrarycard.models
-from virtual_library_card.logging import log
+from virtual_library_card.logging import log as app_log
 from virtual_library_card.profanity import ProfanityWordList
 
+log = app_log.getChild("card_number")
+
 
 class CardNumber:
     NUMBER_GENERATION_RETRIES = 100
@@ -44,7 +46,7 @@ class CardNumber:
 
                 # Test for profane words
                 if ProfanityWordList.contains_profanity(number):
-                    log.info(f"Discarding {number}: Contains profanity.")
+                    log.debug("Discarding %s: Contains profanity.", number)
                     continue
 
                 # Test the availability of this number, else retry
@@ -52,7 +54,7 @@ class CardNumber:
                     library=library_card.library, number=number
                 ).exists()
                 if exists:
-                    log.info(f"Discarding {number}: Card number already exists.")
+                    log.debug("Discarding %s: Card number already exists.", number)
                     continue
 
                 # Number is available
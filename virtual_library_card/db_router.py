@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import HttpRequest
+
+# The session key holding the time until which the reads stay on the primary database
+STICKY_SESSION_KEY = "_db_primary_until"
+
+# These apps are always read from the primary, a stale session would log the user out
+PRIMARY_ONLY_APPS = {"sessions"}
+
+
+@dataclass
+class _RequestState:
+    # Reads may go to the replica, see replica_reads
+    replica: bool = False
+    # A model was written during the request
+    wrote: bool = False
+
+
+_state: ContextVar[_RequestState | None] = ContextVar("db_router_state", default=None)
+
+
+class ReplicaRouter:
+    """Send the reads of the read-only views to the `DATABASE_REPLICA` database alias.
+
+    Only the reads within `replica_reads` (see `ReplicaReadMixin`) use the replica, everything else
+    stays on the default database. Once a request writes, the rest of the request and the requests of the same
+    session for the next `DATABASE_REPLICA_STICKY_SECONDS` read from the primary, so users see their own changes
+    despite the replication lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.replica or not settings.DATABASE_REPLICA:
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return settings.DATABASE_REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.wrote = True
+            state.replica = False
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.DATABASE_REPLICA:
+            return False
+        return None
+
+
+def is_sticky(request: HttpRequest | None) -> bool:
+    """Whether the session wrote recently, and must read from the primary"""
+    session = getattr(request, "session", None)
+    if session is None:
+        return False
+    return session.get(STICKY_SESSION_KEY, 0) > time.time()
+
+
+@contextmanager
+def replica_reads(request: HttpRequest | None = None):
+    """Read from the replica, unless the request's session is within its sticky window"""
+    state = _state.get()
+    if state is None or not settings.DATABASE_REPLICA or is_sticky(request):
+        yield
+        return
+
+    replica, state.replica = state.replica, not state.wrote
+    try:
+        yield
+    finally:
+        state.replica = replica and not state.wrote
+
+
+class ReplicaRouterMiddleware:
+    """Tracks the writes of each request for the ReplicaRouter.
+    Must come after the SessionMiddleware, to make the session sticky after a write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RequestState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote and settings.DATABASE_REPLICA and hasattr(request, "session"):
+            request.session[STICKY_SESSION_KEY] = (
+                time.time() + settings.DATABASE_REPLICA_STICKY_SECONDS
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """Serve the view from the replica database, see ReplicaRouter"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request):
+            response = super().dispatch(request, *args, **kwargs)
+            # Template responses query the database while rendering
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        return response
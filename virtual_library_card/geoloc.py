@@ -4,6 +4,7 @@ import urllib
 from django.conf import settings
 
 from virtual_library_card.logging import log
+from virtual_library_card.metrics import outbound
 
 
 class Geolocalize:
@@ -20,7 +21,7 @@ class Geolocalize:
 
     @staticmethod
     def _lookup_position(latitude, longitude):
-        root_url = "http://www.mapquestapi.com/geocoding/v1/reverse?"
+        root_url = settings.MAPQUEST_REVERSE_GEOCODE_URL + "?"
         params_url = (
             "key="
             + settings.MAPQUEST_API_KEY
@@ -31,12 +32,13 @@ class Geolocalize:
             + "&outFormat=json&thumbMaps=false"
         )
         url = root_url + params_url
-        contents = urllib.request.urlopen(url).read()
+        with outbound("mapquest"):
+            contents = urllib.request.urlopen(url).read()
         return contents
 
     @staticmethod
     def search_for_places(query):
-        root_url = "https://www.mapquestapi.com/search/v3/prediction?"
+        root_url = settings.MAPQUEST_SEARCH_URL + "?"
 
         # We are searching only for administrative areas in US and Canada.
         collection = "adminArea"
@@ -52,9 +54,9 @@ class Geolocalize:
         params_url = urllib.parse.urlencode(parameters)
 
         url = root_url + params_url
-        response = urllib.request.urlopen(url)
-
-        contents = json.loads(response.read())
+        with outbound("mapquest"):
+            response = urllib.request.urlopen(url)
+            contents = json.loads(response.read())
         status = response.status
 
         return contents, status
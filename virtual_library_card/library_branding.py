@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, ClassVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+from virtual_library_card.library_registry import LibraryRegistry
+from virtual_library_card.logging import log
+from virtual_library_card.metrics import record_cache_lookup
+from virtuallibrarycard.models import Library
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+
+@dataclass(frozen=True)
+class LibraryBranding:
+    """An immutable snapshot of everything the website templates need to brand a page for a library.
+    Snapshots are kept in the shared cache, keyed by the library identifier, so the session
+    only needs to hold the identifier and rendering a branded page costs no queries."""
+
+    # Bump this whenever the fields below change, so stale snapshots are never read back
+    VERSION: ClassVar[int] = 1
+    CACHE_KEY_PREFIX: ClassVar[str] = "library-branding"
+
+    identifier: str
+    name: str | None
+    phone: str | None
+    email: str | None
+    social_facebook: str | None
+    social_twitter: str | None
+    logo_header: str
+    places: tuple[str, ...]
+    terms_conditions_url: str
+    privacy_url: str
+
+    @classmethod
+    def from_library(cls, library: Library) -> LibraryBranding:
+        return cls(
+            identifier=library.identifier,
+            name=library.name,
+            phone=library.phone,
+            email=library.email,
+            social_facebook=library.social_facebook,
+            social_twitter=library.social_twitter,
+            logo_header=str(library.logo_header()),
+            places=tuple(library.get_places()),
+            terms_conditions_url=library.terms_conditions_url,
+            privacy_url=library.privacy_url,
+        )
+
+    @classmethod
+    def cache_key(cls, identifier: str) -> str:
+        return f"{cls.CACHE_KEY_PREFIX}:{identifier}"
+
+    @classmethod
+    def get(cls, identifier: str | None) -> LibraryBranding | None:
+        """Get the branding for a library identifier, building and caching it on a miss"""
+        if not identifier:
+            return None
+
+        data = cache.get(cls.cache_key(identifier), version=cls.VERSION)
+        record_cache_lookup("library_branding", hit=data is not None)
+        if data is not None:
+            return cls(**data)
+
+        library = LibraryRegistry.get(identifier)
+        if library is None:
+            return None
+        # The cache was just looked up
+        return cls._build(library)
+
+    @classmethod
+    def for_library(cls, library: Library) -> LibraryBranding:
+        """Get the branding for an already loaded library, building and caching it on a miss"""
+        data = cache.get(cls.cache_key(library.identifier), version=cls.VERSION)
+        record_cache_lookup("library_branding", hit=data is not None)
+        if data is not None:
+            return cls(**data)
+        return cls._build(library)
+
+    @classmethod
+    def _build(cls, library: Library) -> LibraryBranding:
+        branding = cls.from_library(library)
+        # Cache plain data rather than the instance, so a deploy with new fields cannot unpickle old objects
+        cache.set(
+            cls.cache_key(library.identifier),
+            asdict(branding),
+            timeout=settings.LIBRARY_BRANDING_CACHE_TIMEOUT,
+            version=cls.VERSION,
+        )
+        return branding
+
+    @classmethod
+    def invalidate(cls, identifier: str | None) -> None:
+        if not identifier:
+            return
+        log.debug("Invalidating library branding for %s", identifier)
+        cache.delete(cls.cache_key(identifier), version=cls.VERSION)
+
+
+def library_branding(request: HttpRequest) -> dict[str, LibraryBranding | None]:
+    """Template context processor, exposes the branding of the library in the session as `library_branding`"""
+    session = getattr(request, "session", None)
+    if session is None:
+        return {"library_branding": None}
+    return {"library_branding": LibraryBranding.get(session.get("identifier"))}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import copy
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from virtual_library_card.logging import log
+from virtual_library_card.metrics import record_cache_lookup
+from virtuallibrarycard.models import Library
+
+
+class LibraryRegistry:
+    """Resolve libraries by identifier without hitting the database on every request.
+
+    Lookups go through two tiers:
+    - A process local dictionary, entries expire after `LIBRARY_REGISTRY_LOCAL_TIMEOUT` seconds
+      so changes made by other processes are picked up
+    - The default (shared) cache, entries expire after `LIBRARY_REGISTRY_CACHE_TIMEOUT` seconds
+
+    Both tiers are invalidated by the model signals when a library is saved or deleted.
+    Callers receive a copy of the cached instance, so modifying it does not leak into the registry.
+    """
+
+    CACHE_KEY_PREFIX = "library-registry"
+
+    # identifier -> (expires at, library)
+    _local: dict[str, tuple[float, Library]] = {}
+
+    @classmethod
+    def cache_key(cls, identifier: str) -> str:
+        return f"{cls.CACHE_KEY_PREFIX}:{identifier}"
+
+    @classmethod
+    def get(cls, identifier: str | None) -> Library | None:
+        if not identifier:
+            return None
+
+        now = time.monotonic()
+        entry = cls._local.get(identifier)
+        if entry is not None and entry[0] > now:
+            record_cache_lookup("library_registry_local", hit=True)
+            return copy.copy(entry[1])
+        record_cache_lookup("library_registry_local", hit=False)
+
+        library = cache.get(cls.cache_key(identifier))
+        record_cache_lookup("library_registry", hit=library is not None)
+        if library is None:
+            library = Library.objects.filter(identifier=identifier).first()
+            if library is None:
+                # Unknown identifiers are not cached, they are rare and would only fill up the cache
+                return None
+            cache.set(
+                cls.cache_key(identifier),
+                library,
+                timeout=settings.LIBRARY_REGISTRY_CACHE_TIMEOUT,
+            )
+
+        cls._local[identifier] = (
+            now + settings.LIBRARY_REGISTRY_LOCAL_TIMEOUT,
+            library,
+        )
+        return copy.copy(library)
+
+    @classmethod
+    def invalidate(cls, identifier: str | None) -> None:
+        if not identifier:
+            return
+        log.debug("Invalidating library registry for %s", identifier)
+        cls._local.pop(identifier, None)
+        cache.delete(cls.cache_key(identifier))
+
+    @classmethod
+    def clear_local(cls) -> None:
+        """Drop the process local tier, eg. after a fork"""
+        cls._local.clear()
@@ -1,4 +1,22 @@
+"""
+The app loggers, and the pieces of the LOGGING setting.
+
+Log with %-style arguments rather than f-strings, `log.debug("card %s", number)`: the message is only
+formatted when the record is emitted.
+
+- JsonFormatter writes a JSON object per record, with the `extra` fields of the record.
+- SamplingFilter keeps one in N records of the high frequency loggers, eg. "app.pintest".
+- QueueHandler hands the records over to a thread writing them, so the request threads never wait on the output.
+"""
+
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import queue
+from datetime import UTC, datetime
+from itertools import count
 
 DEFAULT_LOG_NAME = "app"
 
@@ -13,3 +31,145 @@ class LoggingMixin:
 
 # Default logging mechanism
 log = logging.getLogger(DEFAULT_LOG_NAME)
+
+# The attributes of every record, the others were passed with `extra`
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {
+    "message",
+    "asctime",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a JSON object on a single line, for the log collectors"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+        }
+        entry.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in N of the records below WARNING of the given loggers and of their children.
+    The kept records have a `sampled` attribute set to N.
+
+    :param rates: N by logger name, eg. {"app.pintest": 100}
+    """
+
+    def __init__(self, rates: dict[str, int] | None = None):
+        super().__init__()
+        self.rates = rates or {}
+        self._counters: dict[str, count] = {}
+        self._rate_cache: dict[str, int] = {}
+
+    def rate(self, name: str) -> int:
+        """The rate of the logger, or of its closest parent with one"""
+        if name not in self._rate_cache:
+            logger_name = name
+            while logger_name not in self.rates and "." in logger_name:
+                logger_name = logger_name.rpartition(".")[0]
+            self._rate_cache[name] = self.rates.get(logger_name, 1)
+        return self._rate_cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        if rate <= 1:
+            return True
+        # next() on a count is atomic, the request threads share the counters
+        counter = self._counters.setdefault(record.name, count())
+        if next(counter) % rate:
+            return False
+        record.sampled = rate
+        return True
+
+
+# Formats the exceptions of the queued records
+_exception_formatter = logging.Formatter()
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Queue the records for a listener thread, which passes them to the actual handlers.
+
+    In the LOGGING setting, the `handlers` of the queue handler are the ones the listener writes to:
+
+        "queue": {"class": "virtual_library_card.logging.QueueHandler", "handlers": ["console"]}
+
+    The listener is started by the first record of each process: the threads of the uWSGI master do not survive
+    the fork of the workers.
+    """
+
+    listener: logging.handlers.QueueListener | None
+
+    def __init__(self, queue, *handlers: logging.Handler):
+        super().__init__(queue)
+        # The logging configuration replaces it with a listener of its `handlers`
+        self.listener = (
+            logging.handlers.QueueListener(queue, *handlers, respect_handler_level=True)
+            if handlers
+            else None
+        )
+        self._pid = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Handler.handle holds the handler's lock
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self) -> None:
+        if self.listener is None:
+            return
+        if self._pid is not None:
+            # A forked process, the queue may have been locked by the listener of the parent
+            self.queue = queue.SimpleQueue()
+            self.listener = logging.handlers.QueueListener(
+                self.queue,
+                *self.listener.handlers,
+                respect_handler_level=self.listener.respect_handler_level,
+            )
+        self._pid = os.getpid()
+        self.listener.start()
+        # Write the queued records before exiting, the forked processes inherit the registration
+        atexit.unregister(self.stop)
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the listener of this process once it has written the queued records.
+        Does nothing when it is not running, the next record starts it again."""
+        if self.listener is None or self._pid != os.getpid():
+            return
+        atexit.unregister(self.stop)
+        self._pid = None
+        self.listener.stop()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the arguments into the message and format the exception now, they may change once the request
+        thread moves on. The handlers' formatters are applied by the listener."""
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _exception_formatter.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from virtual_library_card.logging import log
+
+
+class LibraryLogo:
+    """Derive the stored urls and resized variants of a library logo.
+
+    Everything is computed once, when the logo is uploaded, and kept in `Library.logo_variants`
+    so that rendering a logo never has to call into the storage backend.
+    Every variant is stored as a PNG, with a WebP alternative under the `<variant>_webp` key.
+    """
+
+    # Widths are twice the rendered size, for high density displays
+    VARIANT_WIDTHS = {
+        # The admin list
+        "thumbnail": 200,
+        # The website header, see "#main-logo .logo" in style.css
+        "header": 360,
+    }
+
+    FORMATS = {
+        "PNG": dict(extension="png", options=dict(optimize=True)),
+        "WEBP": dict(extension="webp", options=dict(quality=85, method=6)),
+    }
+
+    @staticmethod
+    def resize(image: Image.Image, width: int) -> Image.Image:
+        """Scale an image down to the given width, keeping the aspect ratio.
+        Images that are already small enough are returned as they are."""
+        if image.width <= width:
+            return image
+        height = max(1, round(image.height * width / image.width))
+        return image.resize((width, height), Image.Resampling.LANCZOS)
+
+    @classmethod
+    def encode(cls, image: Image.Image, image_format: str = "PNG") -> bytes:
+        output = BytesIO()
+        image.save(output, format=image_format, **cls.FORMATS[image_format]["options"])
+        return output.getvalue()
+
+    @staticmethod
+    def variant_name(name: str, variant: str, extension: str = "png") -> str:
+        """library/logo_lyra.jpg -> library/logo_lyra_thumbnail.png"""
+        path = PurePosixPath(name)
+        return str(path.with_name(f"{path.stem}_{variant}.{extension}"))
+
+    @staticmethod
+    def variant_key(variant: str, image_format: str) -> str:
+        """The key of a variant in `Library.logo_variants`: thumbnail, thumbnail_webp..."""
+        return variant if image_format == "PNG" else f"{variant}_{image_format.lower()}"
+
+    @classmethod
+    def build_variants(cls, name: str, content: bytes | None = None) -> dict[str, str]:
+        """Build the variants for a stored logo
+        :param name: The name of the logo within the storage
+        :param content: The raw image, resized variants are only generated when this is available
+        """
+        variants = {"source": name, "original": default_storage.url(name)}
+        if content is None:
+            return variants
+
+        # Decoded once, each variant is resized once and encoded in every format
+        try:
+            with Image.open(BytesIO(content)) as image:
+                image = image.convert("RGBA")
+        except Exception as e:
+            log.error("Could not read logo %s: %s", name, e)
+            return variants
+
+        for variant, width in cls.VARIANT_WIDTHS.items():
+            resized = cls.resize(image, width)
+            for image_format, config in cls.FORMATS.items():
+                key = cls.variant_key(variant, image_format)
+                try:
+                    encoded = cls.encode(resized, image_format)
+                except Exception as e:
+                    log.error(
+                        "Could not create the %s variant of logo %s: %s", key, name, e
+                    )
+                    continue
+
+                # Replace the variants of a previous upload of the same logo, rather than
+                # storing these next to them under another name
+                variant_name = cls.variant_name(name, variant, config["extension"])
+                default_storage.delete(variant_name)
+                stored = default_storage.save(variant_name, ContentFile(encoded))
+                variants[key] = default_storage.url(stored)
+
+        return variants
+
+    @classmethod
+    def delete_variants(cls, variants: dict[str, str]) -> None:
+        """Delete the stored variants of a logo, once it has been replaced"""
+        name = variants["source"]
+        for variant in cls.VARIANT_WIDTHS:
+            for image_format, config in cls.FORMATS.items():
+                if cls.variant_key(variant, image_format) not in variants:
+                    continue
+                variant_name = cls.variant_name(name, variant, config["extension"])
+                try:
+                    default_storage.delete(variant_name)
+                except Exception as e:
+                    log.error("Could not delete logo variant %s: %s", variant_name, e)
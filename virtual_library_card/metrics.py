@@ -0,0 +1,148 @@
+"""
+The Prometheus metrics, served from /metrics when METRICS_ENABLED is set.
+
+Under uWSGI every worker keeps its own metrics, set the PROMETHEUS_MULTIPROC_DIR environment variable
+to a directory shared by the workers (and emptied before they start) so /metrics reports their sum.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# The view label of the requests not matching any URL, so scanners cannot inflate the label values
+UNMATCHED_VIEW = "<unmatched>"
+
+REQUESTS = Counter("vlc_requests", "The HTTP requests", ["method", "view", "status"])
+REQUEST_DURATION = Histogram(
+    "vlc_request_duration_seconds", "The time spent handling a request", ["view"]
+)
+REQUEST_DB_QUERIES = Histogram(
+    "vlc_request_db_queries",
+    "The database queries of a request",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, float("inf")),
+)
+REQUEST_DB_DURATION = Histogram(
+    "vlc_request_db_duration_seconds",
+    "The time a request spent in database queries",
+    ["view"],
+)
+CACHE_LOOKUPS = Counter(
+    "vlc_cache_lookups", "The lookups of the app caches", ["cache", "result"]
+)
+OUTBOUND_DURATION = Histogram(
+    "vlc_outbound_duration_seconds",
+    "The time spent calling external services",
+    ["service", "outcome"],
+)
+PINTEST_RESULTS = Counter(
+    "vlc_pintest_results", "The PATRONAPI pintest results", ["retcod", "errnum"]
+)
+
+
+def registry() -> CollectorRegistry:
+    """The registry to expose, it aggregates all the workers' metrics in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+# The helpers below do nothing unless METRICS_ENABLED is set, like the middleware
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    if not settings.METRICS_ENABLED:
+        return
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+@contextmanager
+def outbound(service: str):
+    """Time a call to an external service, eg. `with outbound("mapquest"): urlopen(...)`"""
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    outcome = "error"
+    started = time.perf_counter()
+    try:
+        yield
+        outcome = "success"
+    finally:
+        OUTBOUND_DURATION.labels(service=service, outcome=outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+def record_pintest(response):
+    """Count a pintest response by its RETCOD and ERRNUM, returns the response"""
+    if not settings.METRICS_ENABLED:
+        return response
+    PINTEST_RESULTS.labels(
+        retcod=response.data.get("RETCOD", ""),
+        errnum=response.data.get("ERRNUM", ""),
+    ).inc()
+    return response
+
+
+class _QueryCounter:
+    """A database execute wrapper, counting the queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def view_label(request) -> str:
+    """The URL name of the request's view, or its route when it has none.
+    The route holds the URL parameters' names, not their values."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNMATCHED_VIEW
+    return match.url_name or match.route
+
+
+class MetricsMiddleware:
+    """Record the requests, their duration and their database queries, when METRICS_ENABLED is set.
+    It should come first in MIDDLEWARE, to include the time spent in the other middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        view = view_label(request)
+        REQUESTS.labels(
+            method=request.method, view=view, status=response.status_code
+        ).inc()
+        REQUEST_DURATION.labels(view=view).observe(duration)
+        REQUEST_DB_QUERIES.labels(view=view).observe(queries.count)
+        REQUEST_DB_DURATION.labels(view=view).observe(queries.duration)
+        return response
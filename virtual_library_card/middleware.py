@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import inspect
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware import locale
+
+from virtual_library_card.logging import log
+from virtual_library_card.metrics import view_label
+
+# Sampled, see LOG_SAMPLING
+timing_log = log.getChild("timing")
+
+
+def is_stateless(request) -> bool:
+    """Whether the request is for a route that does not use sessions, messages or translations, see
+    STATELESS_URL_PREFIXES"""
+    return request.path_info.startswith(tuple(settings.STATELESS_URL_PREFIXES))
+
+
+class StatelessRoutesMixin:
+    """Skip the middleware for the stateless routes"""
+
+    def __call__(self, request):
+        if is_stateless(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(StatelessRoutesMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class LocaleMiddleware(StatelessRoutesMixin, locale.LocaleMiddleware):
+    pass
+
+
+# The user is read from the session, so is skipped along with it
+class AuthenticationMiddleware(
+    StatelessRoutesMixin, auth_middleware.AuthenticationMiddleware
+):
+    pass
+
+
+class MessageMiddleware(StatelessRoutesMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class MiddlewareTimingMiddleware:
+    """Measure the time spent in each middleware and in the view, when MIDDLEWARE_TIMING is enabled.
+
+    It must come first in MIDDLEWARE, after the MetricsMiddleware. The timings are logged and sent in the
+    Server-Timing header, in milliseconds. A middleware's time covers both its request and its response processing.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MIDDLEWARE_TIMING:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+        # Walk down the chain, and time each call to the next middleware (or the view)
+        self.names = []
+        caller = self
+        while True:
+            # Django wraps every middleware into an exception handler
+            callee = inspect.unwrap(caller.get_response)
+            name = self.name(callee)
+            caller.get_response = self.timed(caller.get_response, name)
+            self.names.append(name)
+            if not hasattr(callee, "get_response"):
+                break
+            caller = callee
+
+    @staticmethod
+    def name(callee) -> str:
+        if inspect.ismethod(callee) or inspect.isfunction(callee):
+            # The handler resolving the URL and calling the view
+            return "view"
+        return type(callee).__name__
+
+    @staticmethod
+    def timed(get_response, name: str):
+        def timed_get_response(request):
+            started = time.perf_counter()
+            try:
+                return get_response(request)
+            finally:
+                request._middleware_timings[name] = time.perf_counter() - started
+
+        return timed_get_response
+
+    def __call__(self, request):
+        request._middleware_timings = {}
+        response = self.get_response(request)
+
+        # Each timing includes the next middleware, down to the view
+        inclusive = [request._middleware_timings.get(name, 0) for name in self.names]
+        durations = {
+            name: inclusive[i] - (inclusive[i + 1] if i + 1 < len(inclusive) else 0)
+            for i, name in enumerate(self.names)
+            if name in request._middleware_timings
+        }
+
+        response["Server-Timing"] = ", ".join(
+            f"{name};dur={duration * 1000:.3f}" for name, duration in durations.items()
+        )
+        if timing_log.isEnabledFor(logging.INFO):
+            # The route rather than the path, the pintest path holds the PIN
+            timings = {
+                name: round(duration * 1000, 2) for name, duration in durations.items()
+            }
+            timing_log.info(
+                "%s %s %s",
+                request.method,
+                view_label(request),
+                " ".join(f"{name}={ms}ms" for name, ms in timings.items()),
+                extra={"timings_ms": timings},
+            )
+        return response
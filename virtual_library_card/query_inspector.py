@@ -0,0 +1,207 @@
+"""
+Find the N+1 and the slow queries, in development and in the tests.
+
+The QueryInspectorMiddleware logs them for each request when QUERY_INSPECTOR is set, and the tests/conftest.py
+plugin reports them for each test, failing the tests running more queries than their `query_budget` marker allows.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+from virtual_library_card.logging import log
+from virtual_library_card.metrics import view_label
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# The frames of these files are never the origin of a query: the execute wrappers, and the installed packages
+IGNORED_PATHS = (
+    str(Path(__file__).resolve()),
+    str(PROJECT_DIR / "virtual_library_card" / "metrics.py"),
+    str(PROJECT_DIR / ".venv"),
+)
+
+# The savepoints come from transaction.atomic, their names change with each block
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+def query_shape(sql: str) -> str:
+    """The query without its parameters, `IN` lists of any length have the same shape"""
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def query_origin() -> str:
+    """The innermost frame of the project code on the stack, as "path:line in function" """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(str(PROJECT_DIR)) and not filename.startswith(
+            IGNORED_PATHS
+        ):
+            path = Path(filename).relative_to(PROJECT_DIR)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+@dataclass
+class RecordedQuery:
+    shape: str
+    duration: float
+    origin: str
+    # The number of the request running the query, None outside of requests, eg. for a test creating its data
+    request: int | None
+
+
+@dataclass
+class RepeatedQuery:
+    """A query shape run several times, the signature of an N+1"""
+
+    shape: str
+    count: int
+    origins: list[str] = field(default_factory=list)
+
+
+class QueryInspector:
+    """Record the queries run on every database, in the current thread, while entered.
+
+    with QueryInspector() as inspector:
+        ...
+    inspector.repeated(5)
+
+    :param track_requests: Number the queries by request, for `by_request`. The requests are followed through the
+        request signals, which every thread sends, only the ones of the current thread are counted.
+    """
+
+    def __init__(self, track_requests: bool = True):
+        self.queries: list[RecordedQuery] = []
+        self.track_requests = track_requests
+        self._stack = ExitStack()
+        self._requests = 0
+        self._request: int | None = None
+        self._thread: int | None = None
+
+    def __enter__(self) -> QueryInspector:
+        # The connections are per thread, the wrappers only see the queries of this thread
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        if self.track_requests:
+            self._thread = threading.get_ident()
+            request_started.connect(self._request_started)
+            request_finished.connect(self._request_finished)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.track_requests:
+            request_started.disconnect(self._request_started)
+            request_finished.disconnect(self._request_finished)
+        self._stack.close()
+
+    def _request_started(self, **kwargs):
+        if threading.get_ident() == self._thread:
+            self._requests += 1
+            self._request = self._requests
+
+    def _request_finished(self, **kwargs):
+        if threading.get_ident() == self._thread:
+            self._request = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not sql.startswith(TRANSACTION_STATEMENTS):
+                self.queries.append(
+                    RecordedQuery(
+                        shape=query_shape(sql),
+                        duration=time.perf_counter() - started,
+                        origin=query_origin(),
+                        request=self._request,
+                    )
+                )
+
+    def by_request(self) -> list[QueryInspector]:
+        """The queries of each request, in separate inspectors"""
+        requests: dict[int, QueryInspector] = {}
+        for query in self.queries:
+            if query.request is not None:
+                requests.setdefault(query.request, QueryInspector()).queries.append(
+                    query
+                )
+        return list(requests.values())
+
+    def repeated(self, threshold: int) -> list[RepeatedQuery]:
+        """The query shapes run at least `threshold` times, the most repeated first"""
+        shapes: dict[str, RepeatedQuery] = {}
+        for query in self.queries:
+            repeated = shapes.setdefault(query.shape, RepeatedQuery(query.shape, 0))
+            repeated.count += 1
+            if query.origin not in repeated.origins:
+                repeated.origins.append(query.origin)
+        return sorted(
+            (repeated for repeated in shapes.values() if repeated.count >= threshold),
+            key=lambda repeated: repeated.count,
+            reverse=True,
+        )
+
+    def slow(self, threshold_ms: float) -> list[RecordedQuery]:
+        return [
+            query for query in self.queries if query.duration * 1000 >= threshold_ms
+        ]
+
+    def report(self, repeats: int, slow_ms: float) -> str:
+        """The repeated and the slow queries, one per line"""
+        lines = []
+        for repeated in self.repeated(repeats):
+            lines.append(
+                f"{repeated.count}x {repeated.shape} from {', '.join(repeated.origins)}"
+            )
+        for query in self.slow(slow_ms):
+            lines.append(
+                f"{query.duration * 1000:.0f}ms {query.shape} from {query.origin}"
+            )
+        return "\n".join(lines)
+
+
+class QueryInspectorMiddleware:
+    """Log the requests repeating a query at least QUERY_INSPECTOR_REPEATS times, or running queries slower than
+    QUERY_INSPECTOR_SLOW_MS, when QUERY_INSPECTOR is set. This is meant for development and staging, recording the
+    origin of each query has a cost."""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTOR:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # All the queries are the request's, there is no need to follow the request signals
+        with QueryInspector(track_requests=False) as inspector:
+            response = self.get_response(request)
+
+        report = inspector.report(
+            settings.QUERY_INSPECTOR_REPEATS, settings.QUERY_INSPECTOR_SLOW_MS
+        )
+        if report:
+            # The route rather than the path, the pintest path holds the PIN
+            log.warning(
+                "%s %s ran %d queries:\n%s",
+                request.method,
+                view_label(request),
+                len(inspector.queries),
+                report,
+            )
+        return response
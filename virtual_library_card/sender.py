@@ -11,6 +11,7 @@ from django.utils.html import strip_tags
 from django.utils.translation import gettext as _
 
 from virtual_library_card.logging import log
+from virtual_library_card.metrics import outbound
 from virtual_library_card.tokens import Tokens, TokenTypes
 
 if TYPE_CHECKING:
@@ -43,7 +44,7 @@ class Sender:
         to = user.email
         host = settings.ROOT_URL
         has_welcome = card_number is not None
-        log.debug(f"send_user_welcome to: {to}, from: {settings.DEFAULT_FROM_EMAIL}")
+        log.debug("send_user_welcome to: %s, from: %s", to, settings.DEFAULT_FROM_EMAIL)
 
         try:
             verification_link = None
@@ -80,7 +81,8 @@ class Sender:
                 subject, plain_message, settings.DEFAULT_FROM_EMAIL, to=[to]
             )
             msg.attach_alternative(html_message, "text/html")
-            msg.send()
+            with outbound("smtp"):
+                msg.send()
         except Exception as e:
             log.error(f"send email error {e}")
 
@@ -98,7 +100,8 @@ class Sender:
         )
         msg.attach_alternative(html_string, "text/html")
         msg.attach_file(report_file)
-        msg.send()
+        with outbound("smtp"):
+            msg.send()
 
     @staticmethod
     def _get_absolute_login_url(library_identifier):
@@ -0,0 +1,55 @@
+"""
+The API only (PATRONAPI) deployment profile.
+
+Apply it at the end of a settings file, after the deployment specific settings:
+
+    from .api import api_profile
+    from .base import *
+    ...
+    api_profile(globals())
+
+It serves the API without the website: only the apps, middleware and template engine the API uses are loaded.
+The TEMPLATES and REST_FRAMEWORK settings are narrowed down from the ones of the settings file, so its overrides are
+kept.
+"""
+
+__all__ = ["api_profile"]
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.postgres",
+    "localflavor",
+    "rest_framework",
+    "virtuallibrarycard.apps.VirtuallibrarycardConfig",
+]
+
+# No sessions, messages, CSRF, locale or authentication, the API is stateless
+MIDDLEWARE = [
+    "virtual_library_card.metrics.MetricsMiddleware",
+    "virtual_library_card.query_inspector.QueryInspectorMiddleware",
+    "virtual_library_card.middleware.MiddlewareTimingMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "virtual_library_card.db_router.ReplicaRouterMiddleware",
+]
+
+
+def api_profile(settings: dict) -> None:
+    """Turn the settings of a settings module, its `globals()`, into the API only profile"""
+    settings["HAS_API"] = True
+    settings["HAS_WEBSITE"] = False
+    settings["INSTALLED_APPS"] = list(INSTALLED_APPS)
+    settings["MIDDLEWARE"] = list(MIDDLEWARE)
+    # The API templates are rendered by jinja
+    settings["TEMPLATES"] = [
+        template
+        for template in settings["TEMPLATES"]
+        if template["BACKEND"] == "django.template.backends.jinja2.Jinja2"
+    ]
+    settings["REST_FRAMEWORK"] = {
+        **settings["REST_FRAMEWORK"],
+        # The PATRONAPI checks the credentials itself
+        "DEFAULT_AUTHENTICATION_CLASSES": [],
+        "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+    }
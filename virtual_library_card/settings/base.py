@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "dal",
     "dal_select2",
     "django.contrib.admin",
@@ -43,33 +44,57 @@ INSTALLED_APPS = [
 
 # Log level is taken from the env
 LOGLEVEL = os.getenv("DJANGO_LOG_LEVEL", "INFO")
+# "full", or "json" for a JSON object per line
+LOG_FORMAT = os.getenv("DJANGO_LOG_FORMAT", "full")
+# Keep one in N of the records below WARNING of these high frequency loggers
+LOG_SAMPLING = {
+    "app.pintest": 100,
+    "app.timing": 100,
+}
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
-            "formatter": "full",
-        }
+            "formatter": LOG_FORMAT,
+        },
+        # Writes to the console from a separate thread
+        "queue": {
+            "class": "virtual_library_card.logging.QueueHandler",
+            "handlers": ["console"],
+            "respect_handler_level": True,
+            "filters": ["sampling"],
+        },
+    },
+    "filters": {
+        "sampling": {
+            "()": "virtual_library_card.logging.SamplingFilter",
+            "rates": LOG_SAMPLING,
+        },
     },
     "formatters": {
         "full": {
             "format": "{asctime} [{levelname}] {name}: {message}",
             "style": "{",
-        }
+        },
+        "json": {
+            "()": "virtual_library_card.logging.JsonFormatter",
+        },
     },
     "loggers": {
         "django": {
-            "handlers": ["console"],
+            "handlers": ["queue"],
             "level": "INFO",
         },
         "app": {
-            "handlers": ["console"],
+            "handlers": ["queue"],
             "level": LOGLEVEL,
             "propagate": False,
         },
         "root": {
-            "handlers": ["console"],
+            "handlers": ["queue"],
             "level": LOGLEVEL,
         },
     },
@@ -96,17 +121,36 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = (
 AUTH_USER_MODEL = "virtuallibrarycard.CustomUser"
 
 MIDDLEWARE = [
-    "django.middleware.csrf.CsrfViewMiddleware",
+    "virtual_library_card.metrics.MetricsMiddleware",
+    "virtual_library_card.query_inspector.QueryInspectorMiddleware",
+    "virtual_library_card.middleware.MiddlewareTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.locale.LocaleMiddleware",
+    # These skip the STATELESS_URL_PREFIXES routes
+    "virtual_library_card.middleware.SessionMiddleware",
+    "virtual_library_card.middleware.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "virtual_library_card.middleware.AuthenticationMiddleware",
+    "virtual_library_card.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "virtual_library_card.db_router.ReplicaRouterMiddleware",
 ]
 
+# The API routes do not use sessions, messages or translations, their requests skip these middleware
+STATELESS_URL_PREFIXES = ["/api/", "/PATRONAPI/", "/version.json", "/metrics"]
+
+# Log the time spent in each middleware and the view, and send it in the Server-Timing header
+MIDDLEWARE_TIMING = False
+
+# Record the request, database, cache, outbound calls and pintest metrics, and serve them from /metrics
+METRICS_ENABLED = False
+
+# Log the requests running the same query QUERY_INSPECTOR_REPEATS times (N+1), or queries slower than
+# QUERY_INSPECTOR_SLOW_MS, with the code they come from. For development and staging.
+QUERY_INSPECTOR = False
+QUERY_INSPECTOR_REPEATS = 5
+QUERY_INSPECTOR_SLOW_MS = 100
+
 USE_I18N = True
 
 ROOT_URLCONF = "virtual_library_card.urls"
@@ -125,6 +169,7 @@ TEMPLATES = [
                 "django.template.context_processors.media",
                 "django.template.context_processors.static",
                 "django.contrib.messages.context_processors.messages",
+                "virtual_library_card.library_branding.library_branding",
             ],
         },
     },
@@ -204,3 +249,27 @@ COMPRESS_POSTCSS_PLUGINS = ("autoprefixer", "postcss-font-magician")
 SITE_ID = 1
 
 DATE_INPUT_FORMATS = ["%m-%d-%Y"]
+
+# The MapQuest endpoints, the load tests point them at a stand-in
+MAPQUEST_REVERSE_GEOCODE_URL = "http://www.mapquestapi.com/geocoding/v1/reverse"
+MAPQUEST_SEARCH_URL = "https://www.mapquestapi.com/search/v3/prediction"
+
+# Library branding snapshots live in the default cache. With a per-process cache (the Django default)
+# a change made in one worker only invalidates that worker, so keep this short unless
+# CACHES points at a shared backend.
+LIBRARY_BRANDING_CACHE_TIMEOUT = 5 * 60
+
+# Library lookups by identifier are cached in the process (short lived, to pick up changes from other processes)
+# and in the default cache.
+LIBRARY_REGISTRY_LOCAL_TIMEOUT = 30
+LIBRARY_REGISTRY_CACHE_TIMEOUT = 5 * 60
+
+# Paginate the large admin changelists (users, library cards) with estimated counts and keyset seeks
+ADMIN_KEYSET_PAGINATION = False
+
+# The database alias the read-only views (PATRONAPI, profile) read from, None reads everything from the default
+# database. After a write, a session keeps reading from the default database for DATABASE_REPLICA_STICKY_SECONDS,
+# which must cover the replication lag.
+DATABASE_ROUTERS = ["virtual_library_card.db_router.ReplicaRouter"]
+DATABASE_REPLICA = None
+DATABASE_REPLICA_STICKY_SECONDS = 10
@@ -23,9 +23,29 @@ DATABASES = {
         "HOST": os.environ.get("VLC_DEV_DB_HOST", "pg"),
         "PORT": os.environ.get("VLC_DEV_DB_PORT", "5432"),
         "OPTIONS": {"sslmode": os.environ.get("VLC_DEV_DB_SSL_MODE", "require")},
+        # Keep the connections open between requests, so each request does not pay for the TLS handshake
+        # and authentication. Each uWSGI worker (and thread) holds one connection, 0 closes it after every request.
+        "CONN_MAX_AGE": int(os.environ.get("VLC_DEV_DB_CONN_MAX_AGE", "60")),
+        # Check a persistent connection before reusing it, in case the database closed it meanwhile
+        "CONN_HEALTH_CHECKS": os.environ.get("VLC_DEV_DB_CONN_HEALTH_CHECKS", "true")
+        != "false",
     }
 }
 
+# A read replica, eg. an RDS read replica, for the read-only views
+if "VLC_DEV_DB_REPLICA_HOST" in os.environ:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": os.environ["VLC_DEV_DB_REPLICA_HOST"],
+        "PORT": os.environ.get("VLC_DEV_DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        # The tests read the replica from the default database
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICA = "replica"
+
+# Log the N+1 and the slow queries of each request
+QUERY_INSPECTOR = os.environ.get("VLC_DEV_QUERY_INSPECTOR", "false") == "true"
+
 # Testing ONLY
 SILENCED_SYSTEM_CHECKS = ["django_recaptcha.recaptcha_test_key_error"]
 
@@ -40,16 +60,22 @@ HTML_MINIFY = True
 
 # These are all dummy values for testing
 MAPQUEST_API_KEY = os.environ.get("VLC_DEV_MAPQUEST_API_KEY", "xxx")
+# eg. the stand-in of ci/loadtest
+if "VLC_DEV_MAPQUEST_URL" in os.environ:
+    MAPQUEST_REVERSE_GEOCODE_URL = (
+        f"{os.environ['VLC_DEV_MAPQUEST_URL']}/geocoding/v1/reverse"
+    )
+    MAPQUEST_SEARCH_URL = f"{os.environ['VLC_DEV_MAPQUEST_URL']}/search/v3/prediction"
 
 MAILERS = {
     "default": {
         "BACKEND": "django.core.mail.backends.smtp.EmailBackend",
         "OPTIONS": {
-            "host": "xxx",
-            "port": 587,
+            "host": os.environ.get("VLC_DEV_SMTP_HOST", "xxx"),
+            "port": int(os.environ.get("VLC_DEV_SMTP_PORT", "587")),
             "username": "xxx",
             "password": "xxx",
-            "use_tls": True,
+            "use_tls": os.environ.get("VLC_DEV_SMTP_USE_TLS", "true") != "false",
         },
     }
 }
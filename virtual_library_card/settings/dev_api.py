@@ -0,0 +1,5 @@
+# The dev settings, with the API only deployment profile
+from .api import api_profile
+from .dev import *  # noqa: F401,F403
+
+api_profile(globals())
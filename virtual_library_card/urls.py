@@ -18,27 +18,12 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import include, path
 
-from virtuallibrarycard.admin import admin_site
-from virtuallibrarycard.views import (
-    CustomLoginView,
-    LibraryCardDeleteView,
-    PasswordChangeDoneView,
+from virtuallibrarycard.views.views_api import (
     PinTestPOSTViewSet,
     PinTestViewSet,
-    PlaceSearchAheadView,
-    ProfileView,
-    TemplateView,
     UserLibraryCardViewSet,
-    debug_templates,
-    views_library_card,
-    views_password,
-    views_profile,
-)
-from virtuallibrarycard.views.views_verification import (
-    EmailVerificationErrorView,
-    EmailVerificationResendToken,
-    EmailVerificationTokenView,
 )
+from virtuallibrarycard.views.views_metrics import metrics_view
 from virtuallibrarycard.views.views_version import VersionView
 
 urlpatterns = []
@@ -63,6 +48,26 @@ if settings.HAS_API:
     ]
 
 if settings.HAS_WEBSITE:
+    # Only imported by the website, an API only deployment does not load the forms and the website views
+    from django.views.generic import TemplateView
+
+    from virtuallibrarycard.admin import admin_site
+    from virtuallibrarycard.views import (
+        views_library_card,
+        views_password,
+        views_profile,
+    )
+    from virtuallibrarycard.views.views import debug_templates
+    from virtuallibrarycard.views.views_library_card import LibraryCardDeleteView
+    from virtuallibrarycard.views.views_password import PasswordChangeDoneView
+    from virtuallibrarycard.views.views_place import PlaceSearchAheadView
+    from virtuallibrarycard.views.views_profile import CustomLoginView, ProfileView
+    from virtuallibrarycard.views.views_verification import (
+        EmailVerificationErrorView,
+        EmailVerificationResendToken,
+        EmailVerificationTokenView,
+    )
+
     urlpatterns += [
         # HOME
         path("", views_profile.ProfileView.as_view()),
@@ -183,8 +188,12 @@ if settings.HAS_WEBSITE:
 # Controller that returns information about the version of the deployed app
 urlpatterns += [
     path("version.json", VersionView.as_view()),
+    # Prometheus metrics, when METRICS_ENABLED is set
+    path("metrics", metrics_view, name="metrics"),
 ]
 
-handler404 = "virtuallibrarycard.views.handler404"
-handler400 = "virtuallibrarycard.views.handler400"
-handler500 = "virtuallibrarycard.views.handler500"
+if settings.HAS_WEBSITE:
+    # The error pages use the website layout, the API uses the Django defaults
+    handler404 = "virtuallibrarycard.views.views.handler404"
+    handler400 = "virtuallibrarycard.views.views.handler400"
+    handler500 = "virtuallibrarycard.views.views.handler500"
@@ -1,7 +1,7 @@
-from datetime import UTC, datetime
-
+from virtual_library_card.library_branding import LibraryBranding
+from virtual_library_card.library_registry import LibraryRegistry
 from virtual_library_card.logging import log
-from virtuallibrarycard.models import Library, LibraryCard
+from virtuallibrarycard.models import LibraryCard
 
 
 class UserSessionManager:
@@ -9,7 +9,7 @@ class UserSessionManager:
     def set_session_identifier_info(self, identifier):
         if identifier:
             try:
-                library = Library.objects.filter(identifier=identifier).first()
+                library = LibraryRegistry.get(identifier)
                 UserSessionManager.set_session_library(self, library)
             except Exception as e:
                 log.error(f"Set session identifier error {e}")
@@ -22,7 +22,7 @@ class UserSessionManager:
         identifier = self.request.GET.get("identifier", None)
         if identifier:
             try:
-                library = Library.objects.filter(identifier=identifier).first()
+                library = LibraryRegistry.get(identifier)
                 UserSessionManager.set_session_library(self, library)
             except Exception as e:
                 log.error(f"Set session info error {e}")
@@ -34,20 +34,17 @@ class UserSessionManager:
 
     @staticmethod
     def set_request_session_library(request, library):
-        request.session["library_phone"] = library.phone
-        request.session["identifier"] = library.identifier
-        request.session["library_name"] = library.name
-        request.session["social_facebook"] = library.social_facebook
-        request.session["social_twitter"] = library.social_twitter
-        request.session["logo_header"] = library.logo_header()
-        request.session["email"] = library.email
-        request.session["places"] = library.get_places()
-        request.session["terms_conditions_url"] = library.terms_conditions_url
-        request.session["privacy_url"] = library.privacy_url
+        """Only the identifier is kept in the session, the templates read the
+        rest of the library data from the cached `LibraryBranding`"""
+        LibraryBranding.for_library(library)
+        # Avoid a session write when the library has not changed
+        if request.session.get("identifier") != library.identifier:
+            request.session["identifier"] = library.identifier
 
     @staticmethod
     def clean_session_data(request):
         request.session.pop("sess_variable", None)
+        # Sessions created before the branding cache still carry the library data
         request.session.pop("library_phone", None)
         request.session.pop("identifier", None)
         request.session.pop("library_name", None)
@@ -64,9 +61,10 @@ class UserSessionManager:
         """
         :param context:
         """
-        now = datetime.now(UTC)
+        # Cards that reach their expiration date are marked by the expirelibrarycards command
         library_cards = LibraryCard.objects.filter(
-            user=user, canceled_date=None
-        ).exclude(expiration_date__lte=now)
+            user=user, status=LibraryCard.Status.ACTIVE
+        )
         context["library_cards"] = library_cards
-        context["nb_library_cards"] = library_cards.count()
+        # Fetches the cards, the template gets them from the queryset cache
+        context["nb_library_cards"] = len(library_cards)
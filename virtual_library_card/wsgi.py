@@ -7,11 +7,22 @@ For more information on this file, see
 https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 """
 
+import gc
 import os
+import random
+import re
+import time
+from pathlib import Path
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
 
 from virtual_library_card.logging import log
+from virtual_library_card.profanity import ProfanityWordList
 
 UWSGI_PRESENT = True
 try:
@@ -24,48 +35,105 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "virtual_library_card.settings.p
 django_app = get_wsgi_application()
 
 
-class CensorUriException(Exception):
-    pass
-
-
-def censor_password_from_pintest_uri(uri):
-    # Pintest uri is in the form of /{api,PATRONAPI}/<card_number>/<password>/pintest
-    if "pintest" not in uri:
-        return uri
+def uwsgi_preloads() -> bool:
+    """Whether uWSGI loads the app in the master process and forks the workers from it,
+    which is the case unless lazy-apps (or lazy) is set"""
+    if not UWSGI_PRESENT:
+        return False
+    for option in ("lazy-apps", "lazy"):
+        value = uwsgi.opt.get(option)
+        if isinstance(value, bytes):
+            value = value.decode()
+        if value not in (None, False, "0", "false", "off", "no"):
+            return False
+    return True
+
+
+def warm_up():
+    """Load what every worker would otherwise load on its first requests, so the forked workers share it"""
+    # Until the fork, collections would only touch the pages holding the objects
+    gc.disable()
+    started = time.perf_counter()
+
+    # Imports the URLconf, and with it the views, forms, DRF and the admin
+    get_resolver().reverse_dict
+    # Compiles the project templates, the cached loaders and jinja keep them
+    for engine in engines.all():
+        for directory in map(Path, engine.dirs):
+            for path in directory.rglob("*.*"):
+                try:
+                    engine.get_template(path.relative_to(directory).as_posix())
+                except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                    log.debug("Could not preload template %s: %s", path, e)
+    # Loads the translation catalogs
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+    ProfanityWordList.wordlist()
+
+    # A connection must not be shared by the workers, each one opens its own
+    connections.close_all()
+
+    log.info("Warmed up the app in %.2fs", time.perf_counter() - started)
+    # Move everything loaded so far out of the collector's reach,
+    # collections in the workers would otherwise copy the shared pages
+    gc.freeze()
+
+
+def after_fork():
+    """Reset the process state inherited from the master, in a worker"""
+    gc.enable()
+    # The workers would otherwise generate the same card numbers
+    random.seed()
+
+    # Imports the models, which need the app to be set up
+    from virtual_library_card.library_registry import LibraryRegistry
+
+    LibraryRegistry.clear_local()
 
-    couldnt_censor_uri_exception = CensorUriException(
-        f"Couldn't censor pintest uri - {uri}"
-    )
 
-    split_uri = uri.split("/")
+class CensorUriException(Exception):
+    pass
 
-    # split_uri should be ["", "{api,PATRONAPI}", "<card_number>", "<password>", "pintest"]
-    # It contains empty string on index 0 due to prefix slash in the uri
-    password_index = 3
 
-    if len(split_uri) != 5:
-        raise couldnt_censor_uri_exception
+# /{api,PATRONAPI}/<card_number>/<pin>/pintest, or /{api,PATRONAPI}/pintest for the POST requests,
+# with any casing, an optional trailing slash and an optional query string
+_PINTEST_URI = re.compile(
+    r"/(?:api|patronapi)(?:/[^/?#]+/(?P<pin>[^/?#]+))?/pintest/?(?P<query>[?#].*)?",
+    re.IGNORECASE | re.DOTALL,
+)
+_PIN_PARAMETER = re.compile(r"([?&]pin=)[^&#]*", re.IGNORECASE)
 
-    if split_uri[1] not in {"api", "PATRONAPI"}:
-        raise couldnt_censor_uri_exception
+# Logged instead of the pintest uris that could not be censored
+UNCENSORED_URI = "<uncensored pintest uri>"
 
-    if split_uri[-1] != "pintest":
-        raise couldnt_censor_uri_exception
 
-    split_uri[password_index] = "***"
+def censor_password_from_pintest_uri(uri: str) -> str:
+    """Replace the PIN of a pintest uri, and the `pin` parameter of its query string, with ***
+    :raises CensorUriException: If the uri mentions pintest without being a pintest uri
+    """
+    # Cheaper than a case insensitive search
+    if "pintest" not in uri.lower():
+        return uri
 
-    censored_uri = "/".join(split_uri)
+    match = _PINTEST_URI.fullmatch(uri)
+    if match is None:
+        # The uri may hold the PIN, it is not part of the message
+        raise CensorUriException("Couldn't censor pintest uri")
 
-    return censored_uri
+    start, end = match.span("pin")
+    if start >= 0:
+        uri = f"{uri[:start]}***{uri[end:]}"
+    if match["query"]:
+        uri = _PIN_PARAMETER.sub(r"\1***", uri)
+    return uri
 
 
 def uwsgi_app(environ, start_response):
-    uri = environ["REQUEST_URI"]
-    if "pintest" in uri:
-        try:
-            uri = censor_password_from_pintest_uri(uri)
-        except Exception as e:
-            log.warning(e)
+    try:
+        uri = censor_password_from_pintest_uri(environ["REQUEST_URI"])
+    except CensorUriException as e:
+        log.warning(e)
+        uri = UNCENSORED_URI
 
     uwsgi.set_logvar("clean_uri", uri)
 
@@ -75,6 +143,12 @@ def uwsgi_app(environ, start_response):
 if UWSGI_PRESENT:
     # If we are running the app under uWSGI we can and want to censor the access logs
     application = uwsgi_app
+
+    if uwsgi_preloads():
+        from uwsgidecorators import postfork
+
+        warm_up()
+        postfork(after_fork)
 else:
     # If we are running it locally or in tests we can't import uwsgi so we can't censor the logs
     application = django_app
@@ -2,12 +2,23 @@ from __future__ import annotations
 
 import csv
 import datetime
-from io import StringIO
+from collections.abc import Iterable
 from typing import Any
 
 from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.contrib.auth.models import Group
+from django.db.models import (
+    Count,
+    OuterRef,
+    Prefetch,
+    Q,
+    StringAgg,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
 from django.http import (
     HttpRequest,
     HttpResponse,
@@ -40,14 +51,27 @@ from virtuallibrarycard.models import (
     Library,
     LibraryAllowedEmailDomains,
     LibraryCard,
+    LibraryPlace,
     Place,
     UserConsent,
 )
+from virtuallibrarycard.pagination import KeysetPaginationAdminMixin
+from virtuallibrarycard.search import TrigramSearchAdminMixin
 from virtuallibrarycard.views.admin_email_customize import (
     AdminCustomizeWelcomeEmailView,
 )
 
 
+def is_changelist(model_admin: admin.ModelAdmin, request: HttpRequest) -> bool:
+    """Whether the request is for the changelist of the model admin, rather than a form, autocomplete or action"""
+    match = getattr(request, "resolver_match", None)
+    opts = model_admin.model._meta
+    return (
+        match is not None
+        and match.url_name == f"{opts.app_label}_{opts.model_name}_changelist"
+    )
+
+
 class UserConsentInline(admin.StackedInline):
     model = UserConsent
     extra = 0
@@ -62,7 +86,9 @@ class UserConsentInline(admin.StackedInline):
         return False
 
 
-class CustomUserAdmin(LoggingMixin, UserAdmin):
+class CustomUserAdmin(
+    LoggingMixin, KeysetPaginationAdminMixin, TrigramSearchAdminMixin, UserAdmin
+):
     add_form_template = "admin/user_add_form.html"
     add_form = CustomUserCreationForm
     form = CustomAdminUserChangeForm
@@ -80,6 +106,7 @@ class CustomUserAdmin(LoggingMixin, UserAdmin):
         "nb_library_cards",
     ]
     list_display_links = ("first_name", "last_name", "email")
+    list_select_related = ["library"]
     fieldsets = (
         (
             _("Personal Info"),
@@ -134,6 +161,7 @@ class CustomUserAdmin(LoggingMixin, UserAdmin):
     # used by other admin forms that have search-fields on users
     # Eg. LibraryCard admin form
     search_fields = ["email", "first_name", "last_name"]
+    prefix_search_fields = ["email", "first_name", "last_name"]
     ordering = ["email"]
 
     def get_inlines(self, request, obj):
@@ -200,11 +228,49 @@ class CustomUserAdmin(LoggingMixin, UserAdmin):
 
     export_as_csv.short_description = _("Export selected users")
 
+    @admin.display(description=_("Groups permission"), ordering="group_names")
+    def groups_permission(self, obj: CustomUser) -> str:
+        if not hasattr(obj, "group_names"):
+            return obj.groups_permission()
+        return obj.group_names or ""
+
+    @admin.display(description=_("Nb library cards"), ordering="library_card_count")
+    def nb_library_cards(self, obj: CustomUser) -> int:
+        if not hasattr(obj, "library_card_count"):
+            return obj.nb_library_cards()
+        return obj.library_card_count
+
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        if request.user.is_superuser:
+        if not request.user.is_superuser:
+            qs = qs.filter(library=request.user.library.id)
+
+        # Only the changelist shows the cards and groups columns, the change form, autocomplete
+        # and actions do not need the subqueries
+        if not is_changelist(self, request):
             return qs
-        return qs.filter(library=request.user.library.id)
+
+        # The changelist columns are computed by the database, rather than a few queries per row
+        user = OuterRef("pk")
+        return qs.annotate(
+            library_card_count=Coalesce(
+                Subquery(
+                    LibraryCard.objects.filter(user=user)
+                    .order_by()
+                    .values("user")
+                    .annotate(count=Count("id"))
+                    .values("count")
+                ),
+                0,
+            ),
+            group_names=Subquery(
+                Group.objects.filter(user=user)
+                .order_by()
+                .values("user")
+                .annotate(names=StringAgg("name", Value(","), order_by="name"))
+                .values("names")
+            ),
+        )
 
 
 class LibraryAllowedDomainsInline(admin.StackedInline):
@@ -293,6 +359,15 @@ class LibraryAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
+        # The places of all the listed libraries are fetched in a single query,
+        # only the changelist shows them
+        if is_changelist(self, request):
+            qs = qs.prefetch_related(
+                Prefetch(
+                    "library_places",
+                    queryset=LibraryPlace.objects.select_related("place"),
+                )
+            )
         if request.user.is_superuser:
             return qs
         return qs.filter(id=request.user.library.id)
@@ -309,7 +384,32 @@ class LibraryAdmin(admin.ModelAdmin):
     export_as_csv.short_description = _("Export selected libraries")
 
 
-class LibraryCardAdmin(admin.ModelAdmin):
+class LibraryCardStatusFilter(admin.SimpleListFilter):
+    """Filter the cards by status, the active cards past their expiration date are expired
+    even before the expirelibrarycards command marks them"""
+
+    title = _("Status")
+    parameter_name = "status"
+
+    def lookups(self, request, model_admin):
+        return LibraryCard.Status.choices
+
+    def queryset(self, request, queryset):
+        due = Q(
+            status=LibraryCard.Status.ACTIVE,
+            expiration_date__lte=datetime.datetime.now(datetime.UTC),
+        )
+        value = self.value()
+        if value == LibraryCard.Status.ACTIVE:
+            return queryset.filter(status=LibraryCard.Status.ACTIVE).exclude(due)
+        if value == LibraryCard.Status.EXPIRED:
+            return queryset.filter(Q(status=LibraryCard.Status.EXPIRED) | due)
+        if value == LibraryCard.Status.CANCELLED:
+            return queryset.filter(status=LibraryCard.Status.CANCELLED)
+        return queryset
+
+
+class LibraryCardAdmin(KeysetPaginationAdminMixin, admin.ModelAdmin):
     model = LibraryCard
     form = LibraryCardCreationForm
     list_display = [
@@ -321,6 +421,7 @@ class LibraryCardAdmin(admin.ModelAdmin):
         "canceled_by_user",
         "library",
     ]
+    list_select_related = ["user", "library"]
 
     actions = ["export_as_csv"]
     readonly_fields = (
@@ -348,9 +449,9 @@ class LibraryCardAdmin(admin.ModelAdmin):
 
     def get_list_filter(self, request: Any) -> tuple[Any]:
         return (
-            ("library", "expiration_date")
+            ("library", LibraryCardStatusFilter, "expiration_date")
             if request.user.is_superuser
-            else ("expiration_date",)
+            else (LibraryCardStatusFilter, "expiration_date")
         )
 
     def get_queryset(self, request):
@@ -380,18 +481,41 @@ class LibraryCardAdmin(admin.ModelAdmin):
         return super().change_view(request, object_id, form_url, extra_context)
 
 
+# Rows fetched per database round trip while streaming an export
+EXPORT_CHUNK_SIZE = 2000
+
+
+class CSVEchoBuffer:
+    """A write-only file-like object that hands back what is written to it,
+    so the csv writer can produce rows for a streaming response"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_csv_response(rows: Iterable[list[Any]], filename: str):
+    """Stream the csv rows to the client as they are produced, the content is never held in memory"""
+    writer = csv.writer(CSVEchoBuffer())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows), content_type="text/csv"
+    )
+    response["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
 def export_list_as_csv(self, request, queryset):
     meta = self.model._meta
     field_names = [field.name for field in meta.fields]
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f"attachment; filename={meta}.csv"
-    writer = csv.writer(response)
+    # Related objects are exported by their display value, join them instead of a query per row
+    related = [field.name for field in meta.fields if field.is_relation]
+    objects = queryset.select_related(*related).iterator(chunk_size=EXPORT_CHUNK_SIZE)
 
-    writer.writerow(field_names)
-    for obj in queryset:
-        row = writer.writerow([getattr(obj, field) for field in field_names])
+    def rows():
+        yield field_names
+        for obj in objects:
+            yield [getattr(obj, field) for field in field_names]
 
-    return response
+    return stream_csv_response(rows(), f"{meta}.csv")
 
 
 class LibraryCardsUploadCSV(PermissionRequiredMixin, TemplateView):
@@ -463,12 +587,13 @@ class LibraryCardsUploadCSV(PermissionRequiredMixin, TemplateView):
         return self.render_to_response(ctx)
 
 
-class PlaceAdmin(admin.ModelAdmin):
+class PlaceAdmin(TrigramSearchAdminMixin, admin.ModelAdmin):
     model = Place
     list_display = ["name", "type", "parent"]
     ordering = ["name"]
     list_filter = ["type"]
     search_fields = ["name", "abbreviation__exact", "parent__name"]
+    prefix_search_fields = ["name", "abbreviation"]
     form = CustomPlaceChangeForm
 
     class Media:
@@ -479,34 +604,46 @@ def export_users_by_consent(request: HttpRequest):
     """Export users by consent type in a csv format.
     The method expects a GET parameter 'type'.
     """
-    # Only staff and admin users
-    if not request.user.is_staff:
+    # Only staff and admin users, the staff of a library
+    if not request.user.is_staff or (
+        not request.user.is_superuser and request.user.library_id is None
+    ):
         return HttpResponseForbidden()
 
     consent_type = request.GET["type"]
-    content = StringIO()
-    consents = UserConsent.objects.filter(type=consent_type).all()
-    headers = ["name", "email", "type", "method", "version", "time"]
-    csv_content = csv.DictWriter(content, fieldnames=headers)
-    csv_content.writeheader()
-
-    for consent in consents:
-        item = dict(
-            name=consent.user.get_full_name(),
-            email=consent.user.email,
-            type=consent.type,
-            method=consent.method,
-            version=consent.version,
-            time=consent.timestamp,
+    consents = (
+        UserConsent.objects.filter(type=consent_type)
+        .select_related("user")
+        .only(
+            "type",
+            "method",
+            "version",
+            "timestamp",
+            "user__first_name",
+            "user__last_name",
+            "user__email",
         )
-        csv_content.writerow(item)
+        .order_by("id")
+    )
+    # Staff only get to see the users of their own library
+    if not request.user.is_superuser:
+        consents = consents.filter(user__library=request.user.library_id)
+
+    def rows():
+        yield ["name", "email", "type", "method", "version", "time"]
+        for consent in consents.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield [
+                consent.user.get_full_name(),
+                consent.user.email,
+                consent.type,
+                consent.method,
+                consent.version,
+                consent.timestamp,
+            ]
 
-    content.seek(0)
-    response = StreamingHttpResponse(content, content_type="text/csv")
-    response["Content-Disposition"] = (
-        f"attachment; filename=consented_users_{consent_type}_{datetime.datetime.now()}.csv"
+    return stream_csv_response(
+        rows(), f"consented_users_{consent_type}_{datetime.datetime.now()}.csv"
     )
-    return response
 
 
 class VLCAdminSite(admin.AdminSite):
@@ -5,3 +5,7 @@ class VirtuallibrarycardConfig(AppConfig):
     name = "virtuallibrarycard"
     verbose_name = "Virtual Library Card"
     default_auto_field = "django.db.models.AutoField"
+
+    def ready(self) -> None:
+        # Connect the cache invalidation receivers
+        import virtuallibrarycard.signals  # noqa: F401
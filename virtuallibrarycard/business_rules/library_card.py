@@ -3,7 +3,7 @@ from __future__ import annotations
 import csv
 from collections.abc import Generator
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime
 from io import BytesIO, StringIO
 from os import linesep
 from random import random
@@ -36,6 +36,30 @@ class LibraryCardRules:
             return card, True
         return existing_library_card, False
 
+    @classmethod
+    def expire_cards(cls, batch_size: int = 1000, now: datetime | None = None) -> int:
+        """Mark the active cards past their expiration date as expired.
+        Cards are updated in batches, each in its own transaction, so rows are never locked for long.
+        :return: The number of cards that were expired
+        """
+        now = now or datetime.now(UTC)
+        due = LibraryCard.objects.filter(
+            status=LibraryCard.Status.ACTIVE, expiration_date__lte=now
+        )
+
+        expired = 0
+        while True:
+            batch = due.order_by().values("id")[:batch_size]
+            # The card may have changed since the batch was selected, check it again
+            updated = due.filter(id__in=batch).update(status=LibraryCard.Status.EXPIRED)
+            expired += updated
+            log.debug("Expired a batch of %d library cards", updated)
+            if updated < batch_size:
+                break
+
+        log.info("Expired %s library cards", expired)
+        return expired
+
 
 class LibraryCardBulkUpload:
     REQUIRED_CSV_HEADERS = ["id", "first_name", "email"]
@@ -176,7 +200,7 @@ class LibraryCardBulkUpload:
                 card, _ = LibraryCardRules.new_card(
                     user, self.library, number=prefix + user_id
                 )
-                log.debug(f"Created user and card for {user.email}: {card.number}")
+                log.debug("Created user and card for %s: %s", user.email, card.number)
                 results.append({"card number": card.number, "error": "", **item})
             except Exception as ex:
                 log.error(f"Could not create card or user: {ex}")
@@ -107,7 +107,8 @@ class LibraryChangeForm(forms.ModelForm):
         if self.instance.logo:
             self.fields["logo"].help_text = mark_safe(
                 '<img src="{url}" alt="{alt}" aria-label="{alt}" width="100" />'.format(
-                    url=self.instance.logo.url, alt=self.instance.name + " logo"
+                    url=self.instance.logo_thumbnail_url(),
+                    alt=self.instance.name + " logo",
                 )
             )
 
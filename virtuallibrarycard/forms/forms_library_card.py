@@ -191,7 +191,7 @@ class LibraryCardDeleteForm(LoggingMixin, forms.ModelForm):
 
         else:
             self.log.debug(
-                f"library_card with this number does not exist any more {number}"
+                "library_card with this number does not exist any more %s", number
             )
 
         return super().save(commit=True)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from virtuallibrarycard.business_rules.library_card import LibraryCardRules
+
+
+class Command(BaseCommand):
+    help = "Marks the active library cards past their expiration date as expired, run it periodically"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="The number of cards updated per transaction",
+        )
+
+    def handle(self, *args, **options):
+        expired = LibraryCardRules.expire_cards(batch_size=options["batch_size"])
+        self.stdout.write(f"Expired {expired} library cards")
@@ -0,0 +1,457 @@
+import csv
+import random
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from io import StringIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from virtual_library_card.card_number import CardNumber
+from virtuallibrarycard.models import (
+    CustomUser,
+    Library,
+    LibraryCard,
+    LibraryPlace,
+    Place,
+    UserConsent,
+)
+
+# The generated data is recognized by these, see delete
+IDENTIFIER_PREFIX = "synthetic-"
+EMAIL_DOMAIN = "synthetic.example.com"
+# Every generated user has this password, it is hashed once
+PASSWORD = "synthetic-password"
+
+NAME_STARTS = ["Oak", "Maple", "Cedar", "Pine", "River", "Lake", "Hill", "Spring"]
+NAME_ENDS = ["ton", "ville", "field", "wood", "dale", "port", "burg", "ford"]
+FIRST_NAMES = ["Ada", "Ben", "Cleo", "Dev", "Eve", "Finn", "Gus", "Hana", "Ivo", "Jo"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Khan", "Berg"]
+
+# An odd prime, so multiplying the card serials by it modulo a power of the alphabet size is a bijection
+CARD_NUMBER_SCRAMBLE = 2654435761
+# The marker of the NULL values in the COPY data
+NULL = r"\N"
+
+
+@dataclass
+class Size:
+    libraries: int
+    places: int
+    users: int
+
+
+SIZES = {
+    "small": Size(libraries=20, places=50, users=10_000),
+    "medium": Size(libraries=500, places=1_000, users=200_000),
+    "large": Size(libraries=3_000, places=5_000, users=2_000_000),
+}
+
+
+def copy(cursor, model, columns: list[str], rows: Iterable[tuple]) -> None:
+    """Insert the rows with COPY, much faster than INSERT for large batches"""
+    data = StringIO()
+    writer = csv.writer(data)
+    for row in rows:
+        writer.writerow(NULL if value is None else value for value in row)
+    data.seek(0)
+    table = connection.ops.quote_name(model._meta.db_table)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+        data,
+    )
+
+
+def reserve_ids(cursor, model, count: int) -> int:
+    """Take `count` consecutive ids from the table's sequence, for rows inserted with COPY.
+    :return: The first id"""
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [model._meta.db_table])
+    (sequence,) = cursor.fetchone()
+    cursor.execute(
+        "SELECT setval(%s, nextval(%s) + %s - 1)", [sequence, sequence, count]
+    )
+    (last,) = cursor.fetchone()
+    return last - count + 1
+
+
+def card_number(prefix: str, serial: int) -> str:
+    """A card number as generated by CardNumber, unique for each serial of a library"""
+    alphabet = CardNumber.ALLOWED_CHARACTERS
+    length = CardNumber.CARD_NUMBER_LENGTH - len(prefix)
+    value = serial * CARD_NUMBER_SCRAMBLE % len(alphabet) ** length
+    characters = []
+    for _ in range(length):
+        value, index = divmod(value, len(alphabet))
+        characters.append(alphabet[index])
+    return prefix + "".join(characters)
+
+
+class Generator:
+    """Generate the synthetic places, libraries, users, cards and consents.
+    The same seed and sizes generate the same data, the dates are relative to now."""
+
+    def __init__(
+        self,
+        seed: int,
+        max_cards: int,
+        expired: float,
+        cancelled: float,
+        consent: float,
+    ):
+        self.random = random.Random(seed)
+        self.max_cards = max_cards
+        self.expired = expired
+        self.cancelled = cancelled
+        self.consent = consent
+        self.now = timezone.now()
+        self.places: list[Place] = []
+        self.libraries: list[Library] = []
+        self.card_serials: dict[int, int] = {}
+        self.counts = dict(
+            places=0,
+            users=0,
+            consents=0,
+            **{status.value: 0 for status in LibraryCard.Status},
+        )
+
+    def name(self) -> str:
+        return self.random.choice(NAME_STARTS) + self.random.choice(NAME_ENDS)
+
+    def past(self, since: datetime) -> datetime:
+        """A moment between `since` and now"""
+        seconds = max(1, int((self.now - since).total_seconds()))
+        return since + timedelta(seconds=self.random.randrange(seconds))
+
+    def generate_places(self, count: int) -> None:
+        """Counties within the existing states, and cities within these counties"""
+        states = list(Place.get_states().order_by("id"))
+        if not states:
+            raise CommandError("There are no states, the migrations load them")
+
+        counties = Place.objects.bulk_create(
+            Place(
+                external_id=f"{IDENTIFIER_PREFIX}county-{index}",
+                name=self.name(),
+                type=Place.Types.COUNTY,
+                parent=self.random.choice(states),
+            )
+            for index in range(max(1, count // 4))
+        )
+        cities = Place.objects.bulk_create(
+            Place(
+                external_id=f"{IDENTIFIER_PREFIX}city-{index}",
+                name=self.name(),
+                type=Place.Types.CITY,
+                parent=self.random.choice(counties),
+            )
+            for index in range(count - len(counties))
+        )
+        self.places = states + counties + cities
+        self.counts["places"] = len(counties) + len(cities)
+
+    def generate_libraries(self, count: int) -> None:
+        self.libraries = Library.objects.bulk_create(
+            Library(
+                name=f"{self.name()} Public Library",
+                identifier=f"{IDENTIFIER_PREFIX}{index}",
+                prefix=f"9{index:05d}",
+                bulk_upload_prefix=f"8{index:05d}",
+                logo="library/logo_synthetic.png",
+                email=f"library{index}@{EMAIL_DOMAIN}",
+                terms_conditions_url="https://example.com/terms",
+                privacy_url="https://example.com/privacy",
+                card_validity_months=self.random.choice([None, 12, 24, 36]),
+                allow_bulk_card_uploads=self.random.random() < 0.2,
+                age_verification_mandatory=self.random.random() < 0.7,
+                has_survey_consent=self.random.random() < 0.5,
+            )
+            for index in range(count)
+        )
+        LibraryPlace.objects.bulk_create(
+            LibraryPlace(library=library, place=place)
+            for library in self.libraries
+            for place in self.random.sample(
+                self.places, self.random.choice([1, 1, 1, 2, 3])
+            )
+        )
+
+    def generate_users(self, count: int, batch_size: int, progress=None) -> None:
+        """The users with their cards and consents, inserted with COPY in batches"""
+        password = make_password(PASSWORD)
+        # A few libraries have most of the patrons
+        library_weights = list(
+            accumulate(1 / (rank + 1) for rank in range(len(self.libraries)))
+        )
+        card_weights = [1 / cards**2 for cards in range(1, self.max_cards + 1)]
+
+        with connection.cursor() as cursor:
+            for start in range(0, count, batch_size):
+                size = min(batch_size, count - start)
+                first_id = reserve_ids(cursor, CustomUser, size)
+                users, cards, consents = [], [], []
+                for index in range(start, start + size):
+                    user_id = first_id + index - start
+                    libraries = self.random.choices(
+                        self.libraries,
+                        cum_weights=library_weights,
+                        k=self.random.choices(
+                            range(1, self.max_cards + 1), card_weights
+                        )[0],
+                    )
+                    # The user belongs to the library of their first card
+                    library = libraries[0]
+                    first_name = self.random.choice(FIRST_NAMES)
+                    last_name = self.random.choice(LAST_NAMES)
+                    joined = self.past(self.now - timedelta(days=5 * 365))
+                    users.append(
+                        (
+                            user_id,
+                            password,
+                            f"{first_name}.{last_name}.{index}@{EMAIL_DOMAIN}".lower(),
+                            first_name,
+                            last_name,
+                            library.id,
+                            joined,
+                            self.past(joined) if self.random.random() < 0.6 else None,
+                        )
+                    )
+                    for card_library in dict.fromkeys(libraries):
+                        cards.append(self.card(user_id, card_library, joined))
+                    if (
+                        library.has_survey_consent
+                        and self.random.random() < self.consent
+                    ):
+                        consents.append((user_id, joined))
+
+                copy(
+                    cursor,
+                    CustomUser,
+                    [
+                        "id",
+                        "password",
+                        "email",
+                        "first_name",
+                        "last_name",
+                        "library_id",
+                        "date_joined",
+                        "last_login",
+                        "is_superuser",
+                        "is_staff",
+                        "is_active",
+                        "over13",
+                        "email_verified",
+                    ],
+                    (user + (False, False, True, True, True) for user in users),
+                )
+                copy(
+                    cursor,
+                    LibraryCard,
+                    [
+                        "user_id",
+                        "library_id",
+                        "number",
+                        "created",
+                        "expiration_date",
+                        "canceled_date",
+                        "canceled_by_user",
+                        "status",
+                    ],
+                    cards,
+                )
+                consent_type = UserConsent.ConsentType.SURVEY
+                copy(
+                    cursor,
+                    UserConsent,
+                    ["user_id", "timestamp", "type", "method", "version"],
+                    (
+                        (
+                            user_id,
+                            timestamp,
+                            consent_type.value,
+                            UserConsent.ConsentMethod.WEB_CARD_REQUEST.value,
+                            UserConsent.VERSIONS[consent_type],
+                        )
+                        for user_id, timestamp in consents
+                    ),
+                )
+                self.counts["users"] += len(users)
+                self.counts["consents"] += len(consents)
+                if progress:
+                    progress(self.counts["users"])
+
+    def card(self, user_id: int, library: Library, joined: datetime) -> tuple:
+        serial = self.card_serials.get(library.id, 0)
+        self.card_serials[library.id] = serial + 1
+        created = self.past(joined)
+        months = library.card_validity_months
+
+        roll = self.random.random()
+        canceled_date = None
+        if roll < self.cancelled:
+            status = LibraryCard.Status.CANCELLED
+            canceled_date = self.past(created)
+            expiration_date = None
+        elif roll < self.cancelled + self.expired:
+            status = LibraryCard.Status.EXPIRED
+            expiration_date = self.past(created)
+        else:
+            status = LibraryCard.Status.ACTIVE
+            expiration_date = (
+                self.now + timedelta(days=self.random.randrange(1, months * 30))
+                if months
+                else None
+            )
+        self.counts[status.value] += 1
+        return (
+            user_id,
+            library.id,
+            card_number(library.prefix, serial),
+            created,
+            expiration_date,
+            canceled_date,
+            "admin" if canceled_date else None,
+            status.value,
+        )
+
+
+def delete() -> None:
+    """Delete the generated data. The cards and consents are deleted in a single query each, and the users
+    with plain SQL rather than through the ORM, which would load them all."""
+    users = CustomUser.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+    libraries = Library.objects.filter(identifier__startswith=IDENTIFIER_PREFIX)
+    LibraryCard.objects.filter(library__in=libraries).delete()
+    LibraryCard.objects.filter(user__in=users).delete()
+    UserConsent.objects.filter(user__in=users).delete()
+    with connection.cursor() as cursor:
+        sql, params = users.values("id").query.sql_with_params()
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(CustomUser._meta.db_table)} WHERE id IN ({sql})",
+            params,
+        )
+    libraries.delete()
+    Place.objects.filter(external_id__startswith=IDENTIFIER_PREFIX).delete()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic places, libraries, users, consents and library cards for the performance tests. "
+        "The users and cards are inserted with COPY. The same --seed generates the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            choices=list(SIZES),
+            default="small",
+            help="The preset numbers of libraries, places and users",
+        )
+        parser.add_argument(
+            "--libraries", type=int, help="The number of libraries, over --size"
+        )
+        parser.add_argument(
+            "--places",
+            type=int,
+            help="The number of counties and cities, within the existing states, over --size",
+        )
+        parser.add_argument(
+            "--users", type=int, help="The number of users, over --size"
+        )
+        parser.add_argument(
+            "--max-cards",
+            type=int,
+            default=3,
+            help="The maximum number of cards of a user, most users have one",
+        )
+        parser.add_argument(
+            "--expired", type=float, default=0.15, help="The share of expired cards"
+        )
+        parser.add_argument(
+            "--cancelled",
+            type=float,
+            default=0.05,
+            help="The share of cancelled cards",
+        )
+        parser.add_argument(
+            "--consent",
+            type=float,
+            default=0.6,
+            help="The share of the users of the libraries asking for it giving their survey consent",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="The number of users inserted per COPY",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the generated data, instead of generating it",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options["delete"]:
+            with transaction.atomic():
+                delete()
+            self.stdout.write(
+                f"Deleted the synthetic data in {time.monotonic() - started:.1f}s"
+            )
+            return
+
+        if Library.objects.filter(identifier__startswith=IDENTIFIER_PREFIX).exists():
+            raise CommandError(
+                "The synthetic data was already generated, remove it with --delete"
+            )
+        size = SIZES[options["size"]]
+        libraries = options["libraries"] or size.libraries
+        places = options["places"] or size.places
+        users = options["users"] if options["users"] is not None else size.users
+        if options["expired"] + options["cancelled"] > 1:
+            raise CommandError("--expired and --cancelled add up to more than 1")
+
+        generator = Generator(
+            seed=options["seed"],
+            max_cards=max(1, options["max_cards"]),
+            expired=options["expired"],
+            cancelled=options["cancelled"],
+            consent=options["consent"],
+        )
+
+        def progress(done: int):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{done}/{users} users")
+
+        with transaction.atomic():
+            generator.generate_places(places)
+            generator.generate_libraries(libraries)
+            generator.generate_users(users, options["batch_size"], progress)
+
+        # The planner needs fresh statistics for the tests on this data to be meaningful
+        with connection.cursor() as cursor:
+            for model in (
+                Place,
+                Library,
+                LibraryPlace,
+                CustomUser,
+                LibraryCard,
+                UserConsent,
+            ):
+                cursor.execute(
+                    f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}"
+                )
+
+        counts = generator.counts
+        self.stdout.write(
+            f"Generated {counts['places']} places, {len(generator.libraries)} libraries, "
+            f"{counts['users']} users, {counts['consents']} consents and "
+            f"{sum(counts[status.value] for status in LibraryCard.Status)} library cards "
+            f"({', '.join(f'{counts[status.value]} {status.value}' for status in LibraryCard.Status)}) "
+            f"in {time.monotonic() - started:.1f}s"
+        )
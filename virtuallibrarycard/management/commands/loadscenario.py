@@ -0,0 +1,312 @@
+import os
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from virtuallibrarycard.management.commands.loadtest import percentiles
+from virtuallibrarycard.models import CustomUser, Library, LibraryCard, LibraryPlace
+
+LIBRARY_IDENTIFIER = "loadtest"
+PASSWORD = "loadtest-password"
+
+
+@dataclass
+class LoadTestData:
+    """The library and patrons the scenario signs in with, and the staff member uploading cards"""
+
+    library_id: int
+    place_id: int
+    card_numbers: list[str]
+    staff_email: str | None = None
+    staff_password: str | None = None
+
+
+def prepare(patrons: int, place: str) -> LoadTestData:
+    """Create the load test library and its patrons, unless they already exist.
+    No staff member is created, a known admin login must not be left in the database."""
+    library = Library.objects.filter(identifier=LIBRARY_IDENTIFIER).first()
+    if library is None:
+        library = Library(
+            name="Load Test",
+            identifier=LIBRARY_IDENTIFIER,
+            prefix="9999",
+            bulk_upload_prefix="9998",
+            allow_bulk_card_uploads=True,
+            logo="logo.png",
+            email="loadtest@example.com",
+            terms_conditions_url="https://example.com/terms",
+            privacy_url="https://example.com/privacy",
+        )
+        library.save()
+        LibraryPlace.associate(library, place)
+
+    for index in range(patrons):
+        email = f"patron{index}@loadtest.example.com"
+        if not CustomUser.objects.filter(email=email).exists():
+            user = CustomUser(email=email, first_name=f"Patron{index}", library=library)
+            user.set_password(PASSWORD)
+            user.save()
+            CustomUser.create_card_for_library(library, user).save()
+
+    return LoadTestData(
+        library_id=library.id,
+        place_id=library.places[0].id,
+        card_numbers=list(
+            LibraryCard.objects.filter(
+                library=library, user__email__endswith="@loadtest.example.com"
+            ).values_list("number", flat=True)[:patrons]
+        ),
+    )
+
+
+class Scenario:
+    """The tasks of a simulated user, like a locust user class.
+    Each task sends its requests and returns whether they succeeded."""
+
+    def __init__(self, url: str, data: LoadTestData):
+        self.url = url.rstrip("/")
+        self.data = data
+        self.session = requests.Session()
+        self.signed_in = False
+
+    @staticmethod
+    def tasks() -> dict[str, tuple[int, Callable[["Scenario"], bool]]]:
+        """The tasks by name, with their weight. The API is most of the traffic."""
+        return {
+            "pintest": (50, Scenario.pintest),
+            "dump": (10, Scenario.dump),
+            "profile": (10, Scenario.profile),
+            "login": (5, Scenario.login),
+            "signup": (3, Scenario.signup),
+            "card_request": (2, Scenario.card_request),
+            "bulk_upload": (1, Scenario.bulk_upload),
+        }
+
+    def _post(self, session, path: str, data: dict, **kwargs):
+        """Post a form, with the CSRF token of a previous GET"""
+        data = {**data, "csrfmiddlewaretoken": session.cookies.get("csrftoken", "")}
+        return session.post(
+            f"{self.url}{path}",
+            data=data,
+            allow_redirects=False,
+            headers={"Referer": f"{self.url}{path}"},
+            **kwargs,
+        )
+
+    def pintest(self) -> bool:
+        number = random.choice(self.data.card_numbers)
+        response = self.session.get(f"{self.url}/PATRONAPI/{number}/{PASSWORD}/pintest")
+        return "RETCOD=0" in response.text
+
+    def dump(self) -> bool:
+        number = random.choice(self.data.card_numbers)
+        response = self.session.get(f"{self.url}/PATRONAPI/{number}/dump")
+        return f"P BARCODE[pb]={number}" in response.text
+
+    def _sign_in(self, session, email: str, password: str = PASSWORD):
+        path = f"/accounts/login/{LIBRARY_IDENTIFIER}/"
+        session.get(f"{self.url}{path}")
+        return self._post(session, path, {"username": email, "password": password})
+
+    def login(self) -> bool:
+        index = random.randrange(len(self.data.card_numbers))
+        response = self._sign_in(
+            requests.Session(), f"patron{index}@loadtest.example.com"
+        )
+        return response.status_code == 302
+
+    def profile(self) -> bool:
+        if not self.signed_in:
+            self._sign_in(self.session, "patron0@loadtest.example.com")
+            self.signed_in = True
+        response = self.session.get(
+            f"{self.url}/accounts/profile/", allow_redirects=False
+        )
+        return response.status_code == 200
+
+    def _signup(self, session):
+        """The geolocation step, the location is looked up with MapQuest"""
+        path = f"/account/library_card_signup/{LIBRARY_IDENTIFIER}/"
+        session.get(f"{self.url}{path}")
+        return self._post(
+            session,
+            path,
+            {"lat": "40.7", "long": "-74", "identifier": LIBRARY_IDENTIFIER},
+        )
+
+    def signup(self) -> bool:
+        response = self._signup(requests.Session())
+        return "/account/library_card_request/" in response.headers.get("Location", "")
+
+    def card_request(self) -> bool:
+        """The whole signup, which creates a user and a card, and sends the welcome email"""
+        session = requests.Session()
+        self._signup(session)
+        path = f"/account/library_card_request/?identifier={LIBRARY_IDENTIFIER}"
+        session.get(f"{self.url}{path}")
+        email = f"{uuid.uuid4().hex}@signup.loadtest.example.com"
+        response = self._post(
+            session,
+            path,
+            {
+                "library": self.data.library_id,
+                "country_code": "US",
+                "first_name": "Load",
+                "last_name": "Test",
+                "email": email,
+                "place": self.data.place_id,
+                "over13": "on",
+                "password1": PASSWORD,
+                "password2": PASSWORD,
+                "consent": "on",
+                "g-recaptcha-response": "loadtest",
+            },
+        )
+        return "/account/library_card_request_success/" in response.headers.get(
+            "Location", ""
+        )
+
+    def bulk_upload(self) -> bool:
+        session = requests.Session()
+        self._sign_in(session, self.data.staff_email, self.data.staff_password)
+        path = "/admin/librarycard/upload_by_csv"
+        session.get(f"{self.url}{path}")
+        batch = uuid.uuid4().hex
+        rows = "".join(
+            f"{batch}{i},Bulk{i},{batch}{i}@bulk.loadtest.example.com\n"
+            for i in range(10)
+        )
+        response = self._post(
+            session,
+            path,
+            {"library": self.data.library_id},
+            files={"csv_file": ("upload.csv", f"id,first_name,email\n{rows}")},
+        )
+        return "User upload has been initiated" in response.text
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates users signing up, signing in and calling the PATRONAPI against a running server, "
+        "and reports the throughput and latency of each task. It creates its own library and patrons, "
+        "so it must share the database of the server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url", default="http://localhost:8000", help="The server under test"
+        )
+        parser.add_argument(
+            "--users", type=int, default=10, help="The number of simulated users"
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=60,
+            help="How long the users send requests, in seconds",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            help="Stop after this many tasks per user, rather than after --duration",
+        )
+        parser.add_argument(
+            "--patrons",
+            type=int,
+            default=20,
+            help="The number of patrons the pintest and dump tasks pick from",
+        )
+        parser.add_argument(
+            "--place",
+            default="NY",
+            help="The library's place, it must match the location returned by MapQuest",
+        )
+        parser.add_argument(
+            "--task",
+            action="append",
+            choices=list(Scenario.tasks()),
+            help="Only run these tasks, may be repeated",
+        )
+        parser.add_argument(
+            "--staff-email",
+            help="An existing staff member allowed to upload cards to the load test library, for the bulk_upload task",
+        )
+        parser.add_argument(
+            "--staff-password",
+            default=os.environ.get("VLC_LOADTEST_STAFF_PASSWORD"),
+            help="The staff member's password, defaults to the VLC_LOADTEST_STAFF_PASSWORD environment variable",
+        )
+        parser.add_argument("--seed", type=int, help="Seed the tasks' random choices")
+
+    def handle(self, *args, **options):
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+        has_staff = bool(options["staff_email"] and options["staff_password"])
+        if options["task"] and "bulk_upload" in options["task"] and not has_staff:
+            raise CommandError(
+                "The bulk_upload task needs --staff-email and --staff-password"
+            )
+        tasks = {
+            name: task
+            for name, task in Scenario.tasks().items()
+            if (not options["task"] or name in options["task"])
+            and (name != "bulk_upload" or has_staff)
+        }
+        data = prepare(max(1, options["patrons"]), options["place"])
+        if not data.card_numbers:
+            raise CommandError("Could not create the load test patrons")
+        data.staff_email = options["staff_email"]
+        data.staff_password = options["staff_password"]
+
+        results: dict[str, list[tuple[float, bool]]] = {name: [] for name in tasks}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def user():
+            scenario = Scenario(options["url"], data)
+            names, weights = list(tasks), [weight for weight, _ in tasks.values()]
+            count = 0
+            while time.monotonic() < deadline and (
+                options["requests"] is None or count < options["requests"]
+            ):
+                name = random.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    ok = tasks[name][1](scenario)
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    results[name].append((elapsed, ok))
+                count += 1
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=user) for _ in range(max(1, options["users"]))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report(results, time.monotonic() - started)
+
+    def report(self, results: dict[str, list[tuple[float, bool]]], elapsed: float):
+        self.stdout.write(
+            f"{'task':<14} {'requests':>8} {'failures':>8} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        everything = [result for task in results.values() for result in task]
+        for name, task in [*results.items(), ("total", everything)]:
+            if not task:
+                continue
+            p50, p95, p99 = percentiles([latency for latency, _ in task])
+            failures = sum(1 for _, ok in task if not ok)
+            self.stdout.write(
+                f"{name:<14} {len(task):>8} {failures:>8} {len(task) / elapsed:>7.1f} "
+                f"{p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {p99 * 1000:>8.1f}"
+            )
@@ -0,0 +1,116 @@
+import statistics
+import threading
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+
+def percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    """The p50, p95 and p99 of the latencies"""
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        return quantiles[49], quantiles[94], quantiles[98]
+    latency = latencies[0] if latencies else 0
+    return latency, latency, latency
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends requests through the WSGI application, with and without persistent database connections, "
+        "and reports the latency of each"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/PATRONAPI/0000/0000/pintest",
+            help="The path requested, the default pintest looks up a card",
+        )
+        parser.add_argument("--host", default="localhost", help="The Host header")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="The number of threads sending requests, like uWSGI threads",
+        )
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            help="The CONN_MAX_AGE compared to 0, the configured value by default",
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        configured = settings_dict.get("CONN_MAX_AGE", 0)
+        conn_max_age = options["conn_max_age"]
+        if conn_max_age is None:
+            conn_max_age = configured or 60
+
+        application = WSGIHandler()
+        try:
+            for max_age in (0, conn_max_age):
+                settings_dict["CONN_MAX_AGE"] = max_age
+                connections.close_all()
+                latencies, opened = self.run(application, options)
+                self.report(max_age, latencies, opened)
+        finally:
+            settings_dict["CONN_MAX_AGE"] = configured
+
+    def run(self, application, options) -> tuple[list[float], int]:
+        latencies = []
+        opened = 0
+        lock = threading.Lock()
+
+        def on_connection_created(**kwargs):
+            nonlocal opened
+            with lock:
+                opened += 1
+
+        def start_response(status, headers, exc_info=None):
+            pass
+
+        def worker(count):
+            for _ in range(count):
+                environ = {
+                    "PATH_INFO": options["path"],
+                    "HTTP_HOST": options["host"],
+                }
+                setup_testing_defaults(environ)
+                started = time.perf_counter()
+                response = application(environ, start_response)
+                # Closing the response sends request_finished, which closes the expired connections
+                b"".join(response)
+                response.close()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+            connections.close_all()
+
+        concurrency = max(1, options["concurrency"])
+        per_thread, remainder = divmod(options["requests"], concurrency)
+        # The requests always run in threads, the connection of this thread may be in a transaction
+        threads = [
+            threading.Thread(target=worker, args=(per_thread + (i < remainder),))
+            for i in range(concurrency)
+        ]
+        connection_created.connect(on_connection_created)
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            connection_created.disconnect(on_connection_created)
+        return latencies, opened
+
+    def report(self, max_age: int, latencies: list[float], opened: int):
+        p50, p95, p99 = percentiles(latencies)
+        self.stdout.write(
+            f"CONN_MAX_AGE={max_age}: {len(latencies)} requests, {opened} connections opened, "
+            f"p50 {p50 * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms"
+        )
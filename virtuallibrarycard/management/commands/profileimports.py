@@ -0,0 +1,141 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PHASE_MARKER = "profileimports phase:"
+
+# Runs in a fresh interpreter, the imports of this process are already done
+SCRIPT = f"""
+import json, sys, time
+
+def phase(name):
+    sys.stderr.write("{PHASE_MARKER} " + name + "\\n")
+    sys.stderr.flush()
+
+timings = {{}}
+started = time.perf_counter()
+phase("setup")
+import django
+django.setup()
+timings["setup"] = time.perf_counter() - started
+
+started = time.perf_counter()
+phase("urls")
+from django.urls import get_resolver
+get_resolver().url_patterns
+timings["urls"] = time.perf_counter() - started
+print(json.dumps(timings))
+"""
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    phase: str
+    # In microseconds, as reported by -X importtime
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parses the -X importtime lines, eg. "import time:       123 |        456 |   module" """
+    timings = []
+    phase = "startup"
+    for line in output.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = line.removeprefix(PHASE_MARKER).strip()
+            continue
+        if not line.startswith("import time:"):
+            continue
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line
+            continue
+        timings.append(
+            ImportTiming(
+                module=fields[2].strip(),
+                phase=phase,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+            )
+        )
+    return timings
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the time spent importing each module while setting up Django (app ready) "
+        "and loading the URLconf, in a fresh interpreter"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=25, help="The number of modules listed"
+        )
+        parser.add_argument(
+            "--sort",
+            choices=["self", "cumulative"],
+            default="cumulative",
+            help="Sort the modules by their own import time, or including their imports",
+        )
+        parser.add_argument(
+            "--prefix", help="Only list the modules starting with this prefix"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Start the interpreter this many times, and report the median timings",
+        )
+
+    def handle(self, *args, **options):
+        runs = [self.run() for _ in range(max(1, options["repeat"]))]
+        phases = {
+            phase: statistics.median(run[0][phase] for run in runs)
+            for phase in ("setup", "urls")
+        }
+        timings = runs[0][1]
+
+        self.stdout.write(f"Settings: {settings.SETTINGS_MODULE}")
+        self.stdout.write(
+            f"django.setup(): {phases['setup'] * 1000:.0f}ms, "
+            f"URLconf: {phases['urls'] * 1000:.0f}ms, "
+            f"{len(timings)} modules imported"
+        )
+        for phase in ("setup", "urls"):
+            imported = [t for t in timings if t.phase == phase]
+            self.stdout.write(
+                f"  {phase}: {len(imported)} modules, {sum(t.self_us for t in imported) / 1000:.0f}ms importing"
+            )
+
+        if options["prefix"]:
+            timings = [t for t in timings if t.module.startswith(options["prefix"])]
+        key = "self_us" if options["sort"] == "self" else "cumulative_us"
+        timings.sort(key=lambda t: getattr(t, key), reverse=True)
+
+        self.stdout.write(f"\n{'self ms':>9} {'cumul. ms':>9}  {'phase':<8} module")
+        for timing in timings[: options["limit"]]:
+            self.stdout.write(
+                f"{timing.self_us / 1000:9.1f} {timing.cumulative_us / 1000:9.1f}  {timing.phase:<8} {timing.module}"
+            )
+
+    @staticmethod
+    def run() -> tuple[dict[str, float], list[ImportTiming]]:
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", SCRIPT],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if process.returncode != 0:
+            raise CommandError(process.stderr)
+
+        phases = json.loads(process.stdout.strip().splitlines()[-1])
+        return phases, parse_importtime(process.stderr)
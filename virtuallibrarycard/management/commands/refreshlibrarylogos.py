@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from virtuallibrarycard.models import Library
+
+
+class Command(BaseCommand):
+    help = "Regenerates the stored logo urls and resized variants of every library logo"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--identifier", help="Only refresh the library with this identifier"
+        )
+
+    def handle(self, *args, **options):
+        libraries = Library.objects.exclude(logo="").exclude(logo=None)
+        if options["identifier"]:
+            libraries = libraries.filter(identifier=options["identifier"])
+
+        for library in libraries:
+            try:
+                with library.logo.open("rb") as logo:
+                    content = logo.read()
+            except Exception as e:
+                self.stderr.write(f"{library.identifier}: could not read logo: {e}")
+                continue
+
+            library.refresh_logo_variants(content)
+            library.save(update_fields=["logo_variants"])
+            self.stdout.write(f"{library.identifier}: refreshed logo variants")
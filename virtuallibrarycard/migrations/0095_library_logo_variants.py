@@ -0,0 +1,18 @@
+# Generated by Django 6.1 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("virtuallibrarycard", "0094_remove_library_uuid"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="library",
+            name="logo_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 6.1 on 2026-10-19 12:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently, the tables stay writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ("virtuallibrarycard", "0096_trigram_search_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="customuser",
+            index=models.Index(
+                condition=models.Q(("is_staff", True)),
+                fields=["library"],
+                name="customuser_staff_library",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="librarycard",
+            index=models.Index(
+                fields=["number", "library"], name="librarycard_number_library"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="librarycard",
+            index=models.Index(
+                fields=["user", "library"], name="librarycard_user_library"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="librarycard",
+            index=models.Index(
+                condition=models.Q(("canceled_date", None)),
+                fields=["user", "expiration_date"],
+                name="librarycard_active_user",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="place",
+            index=models.Index(fields=["abbreviation"], name="place_abbreviation"),
+        ),
+        AddIndexConcurrently(
+            model_name="userconsent",
+            index=models.Index(fields=["type", "id"], name="userconsent_type_id"),
+        ),
+        # Only dropped once librarycard_user_library, which covers it, exists
+        migrations.AlterField(
+            model_name="librarycard",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.1 on 2026-10-19 13:00
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Only the cards that are not active need to be updated
+SET_STATUS = """
+UPDATE virtuallibrarycard_librarycard
+SET status = CASE
+    WHEN canceled_date IS NOT NULL THEN 'cancelled'
+    ELSE 'expired'
+END
+WHERE canceled_date IS NOT NULL OR expiration_date < now()
+"""
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently, the cards table stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ("virtuallibrarycard", "0097_index_audit"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="librarycard",
+            name="status",
+            field=models.CharField(default="active", editable=False, max_length=10),
+        ),
+        migrations.RunSQL(SET_STATUS, reverse_sql=migrations.RunSQL.noop),
+        AddIndexConcurrently(
+            model_name="librarycard",
+            index=models.Index(
+                fields=["library", "status"], name="librarycard_library_status"
+            ),
+        ),
+        # Only dropped once librarycard_library_status, which covers it, exists
+        migrations.AlterField(
+            model_name="librarycard",
+            name="library",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="virtuallibrarycard.library",
+            ),
+        ),
+    ]
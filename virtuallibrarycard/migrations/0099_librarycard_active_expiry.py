@@ -0,0 +1,24 @@
+# Generated by Django 6.1 on 2026-10-19 13:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built concurrently, the cards table stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ("virtuallibrarycard", "0098_librarycard_status"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="librarycard",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["expiration_date"],
+                name="librarycard_active_expiry",
+            ),
+        ),
+    ]
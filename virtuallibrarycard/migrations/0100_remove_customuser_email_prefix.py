@@ -0,0 +1,21 @@
+# Generated by Django 6.1 on 2026-10-19 15:00
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The index is dropped concurrently, the users table stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ("virtuallibrarycard", "0099_librarycard_active_expiry"),
+    ]
+
+    operations = [
+        # The email searches are served by customuser_email_trgm
+        RemoveIndexConcurrently(
+            model_name="customuser",
+            name="customuser_email_prefix",
+        ),
+    ]
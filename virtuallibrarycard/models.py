@@ -10,15 +10,18 @@ import django.utils.timezone
 from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.db import models
+from django.db.models.functions import Upper
 from django.templatetags.static import static
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
 
 from virtual_library_card.card_number import CardNumber
+from virtual_library_card.logo import LibraryLogo
 
 
 def boolean_choices():
@@ -87,6 +90,8 @@ class Library(models.Model):
     identifier = models.CharField(max_length=255, null=True, blank=False, unique=True)
 
     logo = models.ImageField(upload_to=generate_filename, null=True, blank=False)
+    # The urls of the logo and its resized variants, computed on upload. See LibraryLogo
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     phone = models.CharField(max_length=50, null=True, blank=True)
     email = models.CharField(max_length=255, null=True, blank=True)
     terms_conditions_url = models.CharField(max_length=255, blank=False)
@@ -148,7 +153,7 @@ class Library(models.Model):
         except IndexError:
             return None
 
-    def get_logo_img(self, logo_url, header):
+    def get_logo_img(self, logo_url, header, webp_url=None):
         img_html = '<img alt="{} logo" aria-label="{} logo" src="{}"{}/>'
 
         if header:
@@ -156,19 +161,45 @@ class Library(models.Model):
         else:
             additional = ' width="100px"'
 
-        return mark_safe(img_html.format(self.name, self.name, logo_url, additional))
+        img_html = img_html.format(self.name, self.name, logo_url, additional)
+        if webp_url:
+            img_html = (
+                f'<picture><source srcset="{webp_url}" type="image/webp"/>'
+                f"{img_html}</picture>"
+            )
+
+        return mark_safe(img_html)
 
     def logo_thumbnail(self):
-        return self.get_logo_img(self.logo_url(), False)
+        return self.get_logo_img(
+            self.logo_thumbnail_url(), False, self._stored_logo_url("thumbnail_webp")
+        )
+
+    def _stored_logo_url(self, variant: str) -> str | None:
+        """The url stored at upload time, only if it still belongs to the current logo"""
+        variants = self.logo_variants or {}
+        if not self.logo or variants.get("source") != self.logo.name:
+            return None
+        return variants.get(variant)
 
     def logo_url(self):
         if self.logo:
-            return default_storage.url(str(self.logo))
+            return self._stored_logo_url("original") or default_storage.url(
+                str(self.logo)
+            )
         else:
             return static("images/logo.png")
 
+    def logo_thumbnail_url(self):
+        return self._stored_logo_url("thumbnail") or self.logo_url()
+
+    def logo_header_url(self):
+        return self._stored_logo_url("header") or self.logo_url()
+
     def logo_header(self):
-        return self.get_logo_img(self.logo_url(), True)
+        return self.get_logo_img(
+            self.logo_header_url(), True, self._stored_logo_url("header_webp")
+        )
 
     def state_name(self):
         try:
@@ -195,6 +226,48 @@ class Library(models.Model):
     def get_allowed_email_domains(self) -> list[str]:
         return [e.domain for e in self.library_email_domains.all()]
 
+    def refresh_logo_variants(self, content: bytes | None = None) -> bool:
+        """Recompute the stored logo urls, if they do not belong to the current logo.
+        Returns whether the variants were changed."""
+        if not self.logo:
+            changed = self.logo_variants != {}
+            self.logo_variants = {}
+            return changed
+
+        if content is None and self.logo_variants.get("source") == self.logo.name:
+            return False
+
+        self.logo_variants = LibraryLogo.build_variants(self.logo.name, content)
+        return True
+
+    def save(
+        self, force_insert=False, force_update=False, using=None, update_fields=None
+    ):
+        # A freshly uploaded logo is still in memory, keep it around to build the variants
+        # without downloading it back from the storage
+        uploaded = None
+        if self.logo and not self.logo._committed:
+            uploaded = self.logo.read()
+            self.logo.seek(0)
+            # The final name of the logo is only known once the file has been committed,
+            # commit it now so the variants are saved along with the library
+            self.logo.save(self.logo.name, self.logo.file, save=False)
+
+        previous_variants = self.logo_variants or {}
+        if self.refresh_logo_variants(uploaded) and update_fields is not None:
+            update_fields = {*update_fields, "logo_variants"}
+
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+
+        # The variants of a replaced logo are not used anymore
+        if previous_variants.get("source") not in (None, self.logo.name):
+            LibraryLogo.delete_variants(previous_variants)
+
 
 class LibraryPlace(models.Model):
     """Library to Place relation"""
@@ -324,6 +397,29 @@ def default_library():
 
 
 class CustomUser(AbstractUser):
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin search, icontains is "UPPER(column) LIKE UPPER(%term%)"
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                name="customuser_email_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("first_name"), name="gin_trgm_ops"),
+                name="customuser_first_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="customuser_last_name_trgm",
+            ),
+            # library_admins
+            models.Index(
+                fields=["library"],
+                condition=models.Q(is_staff=True),
+                name="customuser_staff_library",
+            ),
+        ]
+
     library = models.ForeignKey(
         Library,
         on_delete=models.PROTECT,
@@ -474,15 +570,57 @@ class CustomUser(AbstractUser):
 
 
 class LibraryCard(models.Model):
+    class Status(models.TextChoices):
+        ACTIVE = "active", _("Active")
+        EXPIRED = "expired", _("Expired")
+        CANCELLED = "cancelled", _("Cancelled")
+
+    class Meta:
+        indexes = [
+            # Pin tests look cards up by number, card numbers are unique within a library
+            models.Index(
+                fields=["number", "library"], name="librarycard_number_library"
+            ),
+            # A user's card for a library, this also serves the lookups by user
+            models.Index(fields=["user", "library"], name="librarycard_user_library"),
+            # A user's cards that are not cancelled, by expiration date
+            models.Index(
+                fields=["user", "expiration_date"],
+                condition=models.Q(canceled_date=None),
+                name="librarycard_active_user",
+            ),
+            # The cards of a library by status, this also serves the lookups by library
+            models.Index(
+                fields=["library", "status"], name="librarycard_library_status"
+            ),
+            # The active cards due to expire, see LibraryCardRules.expire_cards
+            models.Index(
+                fields=["expiration_date"],
+                condition=models.Q(status="active"),
+                name="librarycard_active_expiry",
+            ),
+        ]
+
     number = models.CharField(max_length=100, null=True, blank=False)
     expiration_date = models.DateTimeField(null=True, blank=True)
-    library = models.ForeignKey(Library, on_delete=models.SET_NULL, null=True)
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True)
+    # Indexed by librarycard_library_status
+    library = models.ForeignKey(
+        Library, on_delete=models.SET_NULL, null=True, db_index=False
+    )
+    # Indexed by librarycard_user_library
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, null=True, db_index=False
+    )
     created = models.DateTimeField(
         default=django.utils.timezone.now, verbose_name="created"
     )
     canceled_date = models.DateTimeField(null=True, blank=True)
     canceled_by_user = models.CharField(max_length=255, blank=True, null=True)
+    # Derived from the dates whenever the card is saved, see get_status
+    # Cards reaching their expiration date are marked by the expirelibrarycards command
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.ACTIVE, editable=False
+    )
 
     def get_expiration_date(self):
         if (
@@ -512,6 +650,11 @@ class LibraryCard(models.Model):
 
         except Exception as e:
             pass
+
+        self.status = self.get_status()
+        if update_fields is not None:
+            update_fields = {*update_fields, "status"}
+
         super().save(
             force_insert=force_insert,
             force_update=force_update,
@@ -524,6 +667,14 @@ class LibraryCard(models.Model):
             return False
         return self.expiration_date < timezone.now()
 
+    def get_status(self) -> str:
+        """The status as of now, a cancelled card stays cancelled once it expires"""
+        if self.canceled_date is not None:
+            return self.Status.CANCELLED
+        if self.is_expired():
+            return self.Status.EXPIRED
+        return self.Status.ACTIVE
+
     def status_str(self):
         if self.is_expired():
             return _(" | EXPIRED")
@@ -548,6 +699,15 @@ class Place(models.Model):
 
     AREA_TYPES = ((t, t) for t in sorted(Types))
 
+    class Meta:
+        indexes = [
+            # Admin search, icontains is "UPPER(column) LIKE UPPER(%term%)"
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"), name="place_name_trgm"
+            ),
+            models.Index(fields=["abbreviation"], name="place_abbreviation"),
+        ]
+
     # The external identifier from the datasource, this cannot change
     external_id = models.CharField(max_length=128, null=False, blank=False, unique=True)
 
@@ -618,6 +778,10 @@ class UserConsent(models.Model):
                 fields=["user", "type"], name="%(app_label)s_unique_type_user"
             )
         ]
+        indexes = [
+            # The consent export, by type in the id order
+            models.Index(fields=["type", "id"], name="userconsent_type_id"),
+        ]
 
     ## Column attributes
     user = models.ForeignKey(
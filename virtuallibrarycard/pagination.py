@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Field, Model, Q, QuerySet, Subquery
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.functional import cached_property
+
+# Query parameters holding the ordering values of the rows around the current page
+AFTER_VAR = "after"
+BEFORE_VAR = "before"
+
+
+# Below this many rows an exact count is cheap, and the estimate is least reliable
+ESTIMATE_THRESHOLD = 10_000
+
+
+def estimated_count(queryset: QuerySet) -> int | None:
+    """The PostgreSQL planner estimate of the number of rows of an unfiltered queryset.
+    The statistics are refreshed by autovacuum, so the estimate can be slightly off."""
+    query = queryset.query
+    if query.where or query.distinct or query.combinator or query.is_sliced:
+        return None
+
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # A table that was never analyzed has an estimate of -1
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def fast_count(queryset: QuerySet) -> int:
+    """The estimated count of large unfiltered querysets, the exact count otherwise"""
+    estimate = estimated_count(queryset)
+    if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+        return estimate
+    return queryset.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """A paginator that does not count every row of a large unfiltered table, see `fast_count`"""
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            return fast_count(self.object_list)
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """A changelist that reaches the pages next to the current one by seeking past the ordering values
+    of its first or last row (keyset pagination), so they cost the same as the first page.
+    Other pages, and orderings that cannot be seeked on, fall back to the OFFSET pagination.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # page number -> the cursor parameters that lead to it, set by get_results
+        self.cursors: dict[int, dict[str, str]] = {}
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # The cursors are only valid for the current page, they must not leak into the other links
+        for var in (AFTER_VAR, BEFORE_VAR):
+            self.params.pop(var, None)
+            self.filter_params.pop(var, None)
+        return super().get_queryset(request, exclude_parameters)
+
+    def get_query_string(self, new_params=None, remove=None):
+        new_params = dict(new_params or {})
+        page = new_params.get(PAGE_VAR)
+        if page in self.cursors:
+            new_params.update(self.cursors[page])
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        """Mirrors ChangeList.get_results, except for the seek and the estimated full count"""
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        result_count = paginator.count
+
+        if self.model_admin.show_full_result_count:
+            full_result_count = fast_count(self.root_queryset)
+        else:
+            full_result_count = None
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        self.cursors = {}
+        keys = self.keyset_fields()
+        if (self.show_all and can_show_all) or not multi_page:
+            result_list = self.queryset._clone()
+        else:
+            result_list = self.seek(request, keys)
+            if result_list is None:
+                try:
+                    result_list = paginator.page(self.page_num).object_list
+                except InvalidPage:
+                    raise IncorrectLookupParameters
+
+            if keys:
+                # Evaluating the page here caches the rows for the template
+                rows = list(result_list)
+                if rows:
+                    self.cursors[self.page_num + 1] = {
+                        AFTER_VAR: self.encode_cursor(rows[-1], keys)
+                    }
+                    # The first page is cheap without a cursor, and keeps a plain url
+                    if self.page_num > 2:
+                        self.cursors[self.page_num - 1] = {
+                            BEFORE_VAR: self.encode_cursor(rows[0], keys)
+                        }
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(
+            full_result_count
+        )
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+    def keyset_fields(self) -> list[tuple[Field, bool]] | None:
+        """The (field, descending) pairs of the changelist ordering, if it can be seeked on"""
+        keys = []
+        for ordering in self.queryset.query.order_by:
+            if not isinstance(ordering, str) or LOOKUP_SEP in ordering:
+                return None
+            name = ordering.removeprefix("-")
+            try:
+                field = (
+                    self.lookup_opts.pk
+                    if name == "pk"
+                    else self.lookup_opts.get_field(name)
+                )
+            except FieldDoesNotExist:
+                # Annotations and random ordering
+                return None
+            # Relations are ordered by the related model, and NULLs cannot be compared
+            if not field.concrete or field.is_relation or field.null:
+                return None
+            keys.append((field, ordering.startswith("-")))
+        return keys or None
+
+    def seek(self, request, keys: list[tuple[Field, bool]] | None) -> QuerySet | None:
+        if not keys:
+            return None
+
+        for var, forward in ((AFTER_VAR, True), (BEFORE_VAR, False)):
+            if var in request.GET:
+                values = self.decode_cursor(request.GET[var], keys)
+                break
+        else:
+            return None
+        if values is None:
+            return None
+
+        condition = None
+        for (field, descending), value in reversed(list(zip(keys, values))):
+            lookup = "lt" if descending == forward else "gt"
+            past = Q(**{f"{field.name}__{lookup}": value})
+            if condition is not None:
+                past |= Q(**{field.name: value}) & condition
+            condition = past
+
+        queryset = self.queryset.filter(condition)
+        if forward:
+            return queryset[: self.list_per_page]
+        # Walk backwards from the cursor, the page is still displayed in the changelist order
+        return self.queryset.filter(
+            pk__in=Subquery(queryset.reverse().values("pk")[: self.list_per_page])
+        )
+
+    @staticmethod
+    def encode_cursor(obj: Model, keys: list[tuple[Field, bool]]) -> str:
+        return json.dumps([field.value_to_string(obj) for field, _ in keys])
+
+    @staticmethod
+    def decode_cursor(cursor: str, keys: list[tuple[Field, bool]]) -> list[Any] | None:
+        try:
+            values = json.loads(cursor)
+            if not isinstance(values, list) or len(values) != len(keys):
+                return None
+            return [field.to_python(value) for (field, _), value in zip(keys, values)]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+
+class KeysetPaginationAdminMixin:
+    """Use the estimated counts and the keyset pagination on the changelist,
+    when the ADMIN_KEYSET_PAGINATION setting is enabled"""
+
+    def get_changelist(self, request, **kwargs):
+        if settings.ADMIN_KEYSET_PAGINATION:
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        if settings.ADMIN_KEYSET_PAGINATION:
+            return EstimatedCountPaginator(
+                queryset, per_page, orphans, allow_empty_first_page
+            )
+        return super().get_paginator(
+            request, queryset, per_page, orphans, allow_empty_first_page
+        )
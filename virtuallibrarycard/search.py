@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from functools import reduce
+from operator import or_
+
+from django.db.models import Case, Q, Value, When
+
+
+class TrigramSearchAdminMixin:
+    """Admin search on the indexes of large tables.
+
+    The default `search_fields` (`icontains`) are backed by the pg_trgm GIN indexes declared on the models.
+    Among the matches, the ones starting with the search term in one of the `prefix_search_fields` come first,
+    eg. "Jane" before "Benjamin" for "ja" in the autocomplete lists. The changelist keeps its own ordering.
+    """
+
+    prefix_search_fields: list[str] = []
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        term = search_term.strip()
+        if not term or not self.prefix_search_fields:
+            return queryset, may_have_duplicates
+
+        starts_with = reduce(
+            or_,
+            (
+                Q(**{f"{field}__istartswith": term})
+                for field in self.prefix_search_fields
+            ),
+        )
+        ordering = queryset.query.order_by or self.get_ordering(request)
+        queryset = queryset.order_by(
+            Case(When(starts_with, then=Value(0)), default=Value(1)), *ordering
+        )
+        return queryset, may_have_duplicates
@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from virtual_library_card.library_branding import LibraryBranding
+from virtual_library_card.library_registry import LibraryRegistry
+from virtuallibrarycard.models import Library, LibraryPlace, Place
+
+
+def invalidate_library(identifier: str | None) -> None:
+    LibraryRegistry.invalidate(identifier)
+    LibraryBranding.invalidate(identifier)
+
+
+@receiver(pre_save, sender=Library)
+def library_identifier_changing(sender, instance: Library, **kwargs):
+    """The caches are keyed by identifier, so a renamed identifier must drop the old entries"""
+    if instance.pk is None:
+        return
+    previous = (
+        Library.objects.filter(pk=instance.pk)
+        .values_list("identifier", flat=True)
+        .first()
+    )
+    if previous != instance.identifier:
+        invalidate_library(previous)
+
+
+@receiver([post_save, post_delete], sender=Library)
+def library_changed(sender, instance: Library, **kwargs):
+    invalidate_library(instance.identifier)
+
+
+@receiver([post_save, post_delete], sender=LibraryPlace)
+def library_place_changed(sender, instance: LibraryPlace, **kwargs):
+    # The library may already be gone during a cascading delete
+    library = Library.objects.filter(id=instance.library_id).first()
+    if library:
+        LibraryBranding.invalidate(library.identifier)
+
+
+@receiver(post_save, sender=Place)
+def place_changed(sender, instance: Place, **kwargs):
+    """Place names and abbreviations are part of the branding of every library that references them"""
+    for identifier in Library.objects.filter(
+        library_places__place=instance
+    ).values_list("identifier", flat=True):
+        LibraryBranding.invalidate(identifier)
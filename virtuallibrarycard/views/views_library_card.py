@@ -6,6 +6,7 @@ from django.utils.translation import gettext as _
 from django.views.generic import CreateView, FormView, TemplateView, UpdateView
 
 from virtual_library_card.geoloc import Geolocalize
+from virtual_library_card.library_registry import LibraryRegistry
 from virtual_library_card.logging import LoggingMixin
 from virtual_library_card.user_session import UserSessionManager
 from virtuallibrarycard.business_rules.library import LibraryRules
@@ -14,7 +15,7 @@ from virtuallibrarycard.forms.forms_library_card import (
     RequestLibraryCardForm,
     SignupCardForm,
 )
-from virtuallibrarycard.models import CustomUser, Library, LibraryCard
+from virtuallibrarycard.models import CustomUser, LibraryCard
 
 
 class LibraryCardsView(LoginRequiredMixin, TemplateView):
@@ -82,9 +83,10 @@ class LibraryCardRequestView(LoggingMixin, CreateView):
             raise Http404(_("You are not allowed to access this page"))
 
         identifier_from_url_param = self.request.GET.get("identifier", None)
-        self.log.debug(f"================== identifier_from_session: {identifier}")
         self.log.debug(
-            f"================== identifier_from_url_param: {identifier_from_url_param}"
+            "identifier_from_session: %s, identifier_from_url_param: %s",
+            identifier,
+            identifier_from_url_param,
         )
 
         if identifier != identifier_from_url_param:
@@ -92,7 +94,7 @@ class LibraryCardRequestView(LoggingMixin, CreateView):
             self.request.session.modified = True
             raise Http404(_("You are not allowed to access this page"))
 
-        library = Library.objects.filter(identifier=identifier).first()
+        library = LibraryRegistry.get(identifier)
         if not library:
             raise Http404(_("Library does not exist"))
         else:
@@ -116,7 +118,7 @@ class LibraryCardRequestView(LoggingMixin, CreateView):
 
             try:
                 self.model = CustomUser()
-                library = Library.objects.filter(identifier=identifier).first()
+                library = LibraryRegistry.get(identifier)
                 self.model.library = library
                 self.model.username = ""
                 self.model.first_name = ""
@@ -157,7 +159,7 @@ class CardSignupView(FormView):
         identifier = form.cleaned_data.get("identifier")
         if not identifier:
             raise Http404(_("Identifier parameter is mandatory"))
-        library = Library.objects.filter(identifier=identifier).first()
+        library = LibraryRegistry.get(identifier)
         if not library:
             raise Http404(_("Library does not exist"))
         lat = form.cleaned_data.get("lat")
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from virtual_library_card import metrics
+
+
+def metrics_view(request):
+    """The metrics in the Prometheus text format, see virtual_library_card.metrics"""
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+    return HttpResponse(
+        generate_latest(metrics.registry()), content_type=CONTENT_TYPE_LATEST
+    )
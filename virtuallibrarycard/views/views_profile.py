@@ -5,6 +5,7 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DeleteView, TemplateView, UpdateView
 
+from virtual_library_card.db_router import ReplicaReadMixin
 from virtual_library_card.user_session import UserSessionManager
 from virtuallibrarycard.forms.forms_profile import ProfileEditForm
 from virtuallibrarycard.models import CustomUser, LibraryCard
@@ -35,7 +36,7 @@ class CustomLoginView(LoginView):
         return super().form_valid(form)
 
 
-class ProfileView(LoginRequiredMixin, TemplateView):
+class ProfileView(ReplicaReadMixin, LoginRequiredMixin, TemplateView):
     template_name = "accounts/profile.html"
 
     def render_to_response(self, context, **response_kwargs):
@@ -5,10 +5,11 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 import virtual_library_card
+from virtual_library_card.db_router import ReplicaReadMixin
 
 
 @permission_classes((permissions.AllowAny,))
-class VersionView(APIView):
+class VersionView(ReplicaReadMixin, APIView):
     renderer_classes = [JSONRenderer]
 
     @staticmethod